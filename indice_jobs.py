@@ -0,0 +1,240 @@
+"""
+Índice local (SQLite) de todos os trabalhos de etiquetas gerados.
+
+Cada execução grava o trabalho (tipo, pedido, cliente, arquivo gerado) e uma
+linha por caixa com a página do PDF, ou a linha da planilha, onde ela está.
+Assim dá para responder na hora "quais caixas do pedido X / produto Y foram
+etiquetadas e em qual arquivo/página reimprimir". PDFs entregues pelo serviço
+sem passar pelo disco ficam com um nome "memoria://...".
+
+Várias estações gravam no mesmo arquivo: as transações são curtas (um bloco
+de caixas por vez) e um trabalho só aparece nas buscas depois de concluído.
+
+Uso:
+    python indice_jobs.py --pedido 98765
+    python indice_jobs.py --produto 00012345 --desde 2025-10-01
+"""
+import argparse
+import sqlite3
+import sys
+from contextlib import closing
+from datetime import datetime, timedelta
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    pedido TEXT,
+    cliente TEXT,
+    arquivo TEXT NOT NULL,
+    criado_em TEXT NOT NULL,
+    total_caixas INTEGER NOT NULL,
+    concluido INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS caixas (
+    job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    pagina INTEGER NOT NULL,
+    produto TEXT,
+    descricao TEXT,
+    caixa TEXT,
+    qtd INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_pedido ON jobs(pedido, criado_em);
+CREATE INDEX IF NOT EXISTS idx_jobs_criado ON jobs(criado_em);
+CREATE INDEX IF NOT EXISTS idx_caixas_job ON caixas(job_id, pagina);
+CREATE INDEX IF NOT EXISTS idx_caixas_produto ON caixas(produto, job_id);
+"""
+
+TAMANHO_BLOCO = 1000
+ESPERA_BLOQUEIO = 30  # segundos esperando outra estação liberar o banco
+VALIDADE_INCOMPLETOS = timedelta(days=1)  # trabalhos interrompidos são apagados depois disso
+
+
+def default_db_file():
+    app_dir = Path(sys.executable).parent if getattr(sys, 'frozen', False) else Path(__file__).parent
+    return app_dir / "BASE" / "jobs.sqlite"
+
+
+def conectar(db_file=None):
+    db_file = Path(db_file or default_db_file())
+    db_file.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_file, timeout=ESPERA_BLOQUEIO)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(SCHEMA)
+    # Bancos criados antes da coluna concluido
+    if "concluido" not in {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}:
+        conn.execute("ALTER TABLE jobs ADD COLUMN concluido INTEGER NOT NULL DEFAULT 1")
+        conn.commit()
+    return conn
+
+
+def _produto(valor):
+    # Mesmo formato de buscar_caixas: código com 8 dígitos
+    return None if valor is None else str(valor).strip().zfill(8)
+
+
+class RegistroJob:
+    """
+    Grava um trabalho e suas caixas aos poucos, em transações curtas.
+
+    As caixas são inseridas em blocos conforme chegam (por exemplo, enquanto
+    as etiquetas são desenhadas), sem guardar o trabalho inteiro em memória.
+    Cada bloco é confirmado na hora, para não prender o banco das outras
+    estações durante a geração; o trabalho fica marcado como não concluído e
+    fora das buscas até concluir(). cancelar() apaga o que já foi gravado.
+
+    Args:
+        tipo (str): "planilha" (xlsx de caixas) ou "etiquetas" (PDF de etiquetas).
+        arquivo (str | Path): Arquivo gerado.
+        primeira_pagina (int): Página (ou linha da planilha) da primeira caixa.
+        bloco (int): Caixas acumuladas antes de cada INSERT.
+        em_disco (bool): False quando arquivo é só um nome (PDF entregue em
+            memória), gravado como veio em vez do caminho absoluto.
+    """
+
+    def __init__(self, tipo, arquivo, pedido=None, cliente=None, primeira_pagina=1, db_file=None,
+                 bloco=TAMANHO_BLOCO, em_disco=True):
+        self.conn = conectar(db_file)
+        self.bloco = bloco
+        self.pagina = primeira_pagina
+        self.total = 0
+        self._pendentes = []
+        agora = datetime.now()
+        with self.conn:
+            # Trabalhos de execuções que caíram no meio nunca serão concluídos
+            self.conn.execute("DELETE FROM jobs WHERE concluido = 0 AND criado_em < ?",
+                              ((agora - VALIDADE_INCOMPLETOS).isoformat(timespec="seconds"),))
+            cur = self.conn.execute(
+                "INSERT INTO jobs (tipo, pedido, cliente, arquivo, criado_em, total_caixas, concluido) "
+                "VALUES (?, ?, ?, ?, ?, 0, 0)",
+                (tipo, pedido, cliente, str(Path(arquivo).resolve()) if em_disco else str(arquivo),
+                 agora.isoformat(timespec="seconds")),
+            )
+        self.job_id = cur.lastrowid
+
+    def adicionar(self, caixa):
+        """Acrescenta uma caixa (dict com Produto, Descrição, Caixa e Qtd. na Caixa)."""
+        self._pendentes.append((self.job_id, self.pagina, _produto(caixa.get("Produto")), caixa.get("Descrição"),
+                                caixa.get("Caixa"), caixa.get("Qtd. na Caixa")))
+        self.pagina += 1
+        self.total += 1
+        if len(self._pendentes) >= self.bloco:
+            self._gravar_pendentes()
+
+    def _gravar_pendentes(self):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO caixas (job_id, pagina, produto, descricao, caixa, qtd) VALUES (?, ?, ?, ?, ?, ?)",
+                self._pendentes,
+            )
+        self._pendentes.clear()
+
+    def concluir(self):
+        """Grava o que falta, marca o trabalho como concluído e retorna o id."""
+        try:
+            self._gravar_pendentes()
+            with self.conn:
+                self.conn.execute("UPDATE jobs SET total_caixas = ?, concluido = 1 WHERE id = ?",
+                                  (self.total, self.job_id))
+        finally:
+            self.conn.close()
+        return self.job_id
+
+    def cancelar(self):
+        try:
+            self.conn.rollback()
+            with self.conn:
+                self.conn.execute("DELETE FROM jobs WHERE id = ?", (self.job_id,))
+        finally:
+            self.conn.close()
+
+
+def registrar_job(tipo, arquivo, caixas, pedido=None, cliente=None, primeira_pagina=1, db_file=None):
+    """
+    Grava um trabalho e suas caixas (ver RegistroJob).
+
+    Args:
+        tipo (str): "planilha" (xlsx de caixas) ou "etiquetas" (PDF de etiquetas).
+        arquivo (str | Path): Arquivo gerado.
+        caixas (iterable): Dicts com Produto, Descrição, Caixa e Qtd. na Caixa,
+            na ordem em que aparecem no arquivo.
+        primeira_pagina (int): Página (ou linha da planilha) da primeira caixa.
+
+    Returns:
+        int: id do trabalho.
+    """
+    registro = RegistroJob(tipo, arquivo, pedido, cliente, primeira_pagina, db_file)
+    try:
+        for caixa in caixas:
+            registro.adicionar(caixa)
+    except BaseException:
+        registro.cancelar()
+        raise
+    return registro.concluir()
+
+
+def buscar_caixas(pedido=None, produto=None, desde=None, ate=None, tipo=None, db_file=None):
+    """
+    Lista as caixas indexadas, com o arquivo e a página onde estão.
+
+    desde/ate aceitam datas ISO (AAAA-MM-DD) e são inclusivos.
+    """
+    filtros, params = ["j.concluido = 1"], []
+    if pedido:
+        filtros.append("j.pedido = ?")
+        params.append(str(pedido))
+    if produto:
+        filtros.append("c.produto = ?")
+        params.append(str(produto).zfill(8))
+    if desde:
+        filtros.append("j.criado_em >= ?")
+        params.append(str(desde))
+    if ate:
+        filtros.append("j.criado_em < date(?, '+1 day')")
+        params.append(str(ate))
+    if tipo:
+        filtros.append("j.tipo = ?")
+        params.append(tipo)
+
+    sql = """
+        SELECT j.id AS job_id, j.tipo, j.pedido, j.cliente, j.arquivo, j.criado_em,
+               c.pagina, c.produto, c.descricao, c.caixa, c.qtd
+        FROM caixas c JOIN jobs j ON j.id = c.job_id
+    """
+    sql += " WHERE " + " AND ".join(filtros)
+    sql += " ORDER BY j.criado_em, j.id, c.pagina"
+
+    with closing(conectar(db_file)) as conn:
+        return [dict(row) for row in conn.execute(sql, params)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consulta o índice de etiquetas geradas.")
+    parser.add_argument("--pedido")
+    parser.add_argument("--produto")
+    parser.add_argument("--desde", help="AAAA-MM-DD")
+    parser.add_argument("--ate", help="AAAA-MM-DD")
+    parser.add_argument("--tipo", choices=["planilha", "etiquetas"])
+    args = parser.parse_args()
+
+    caixas = buscar_caixas(args.pedido, args.produto, args.desde, args.ate, args.tipo)
+    if not caixas:
+        print("Nenhuma caixa encontrada.")
+        return
+
+    arquivo = None
+    for c in caixas:
+        if c["arquivo"] != arquivo:
+            arquivo = c["arquivo"]
+            print(f"\n{c['criado_em']}  {c['tipo']}  Pedido {c['pedido']}  {c['cliente'] or ''}")
+            print(f"   {arquivo}")
+        local = "linha" if c["tipo"] == "planilha" else "pág."
+        print(f"   {local} {c['pagina']:>5}  {c['produto']}  caixa {c['caixa']:>7}  qtd {c['qtd']}  {c['descricao']}")
+
+    print(f"\n{len(caixas)} caixas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Leitura de planilhas em modo streaming para os geradores de etiquetas.
+
+As linhas são lidas com o openpyxl em modo read-only, convertidas e validadas
+uma a uma, sem montar um DataFrame nem a lista completa de registros.
+"""
+import math
+from openpyxl import load_workbook
+
+
+def texto(valor):
+    """Converte uma célula para texto, como pd.read_excel(dtype=str) faria."""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+
+def inteiro(valor):
+    if isinstance(valor, str):
+        valor = valor.strip().replace(",", ".")
+    numero = float(valor)
+    if not numero.is_integer():
+        raise ValueError(f"valor não inteiro: {valor}")
+    return int(numero)
+
+
+def vazio(valor):
+    return valor is None or (isinstance(valor, str) and not valor.strip()) or (
+        isinstance(valor, float) and math.isnan(valor))
+
+
+def contar_linhas(excel_file):
+    """Número aproximado de linhas de dados, lido da dimensão da planilha."""
+    try:
+        wb = load_workbook(excel_file, read_only=True, data_only=True)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Arquivo excel não encontrado: {excel_file}")
+    except Exception as e:
+        raise ValueError(f"Leitura do arquivo excel falhou: {str(e)}")
+    try:
+        max_row = wb.active.max_row
+    finally:
+        wb.close()
+    if hasattr(excel_file, "seek"):
+        excel_file.seek(0)
+    return max(max_row - 1, 0) if max_row else None
+
+
+def iter_linhas_excel(excel_file, required_cols, conversores=None, permitir_vazio=True, nao_vazias=()):
+    """
+    Itera as linhas da primeira planilha como dicts, validando cada uma.
+
+    Args:
+        excel_file (str | Path | file): Planilha .xlsx (caminho ou buffer binário).
+        required_cols (list): Colunas que devem existir no cabeçalho.
+        conversores (dict, optional): Coluna → função de conversão do valor.
+        permitir_vazio (bool): Se False, qualquer célula vazia em uma coluna
+            obrigatória interrompe a leitura. Se True, só é erro quando a coluna
+            inteira está vazia (verificado ao final da iteração).
+        nao_vazias (iterable): Colunas que não podem ter célula vazia em
+            nenhuma linha, mesmo com permitir_vazio=True.
+
+    Raises:
+        FileNotFoundError: Se a planilha não existir.
+        ValueError: Se faltarem colunas, a planilha estiver vazia ou uma linha
+            for inválida.
+    """
+    conversores = conversores or {}
+
+    try:
+        wb = load_workbook(excel_file, read_only=True, data_only=True)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Arquivo excel não encontrado: {excel_file}")
+    except Exception as e:
+        raise ValueError(f"Leitura do arquivo excel falhou: {str(e)}")
+
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            raise ValueError("Arquivo excel está vazio.")
+        header = [str(h).strip() if h is not None else None for h in header]
+
+        for col in required_cols:
+            if col not in header:
+                raise ValueError(f"Colunas faltando no arquivo: {col}")
+
+        preenchidas = set()
+        total = 0
+
+        for row_num, values in enumerate(rows, 2):
+            if all(vazio(v) for v in values):
+                continue
+
+            row = {}
+            for col, valor in zip(header, values):
+                if col is None:
+                    continue
+                if vazio(valor):
+                    if col in nao_vazias or (col in required_cols and not permitir_vazio):
+                        raise ValueError(f"Coluna {col} está vazia (linha {row_num}).")
+                    row[col] = None
+                    continue
+
+                preenchidas.add(col)
+                if col in conversores:
+                    try:
+                        valor = conversores[col](valor)
+                    except (TypeError, ValueError) as e:
+                        raise ValueError(f"Valor inválido na coluna '{col}' (linha {row_num}): {e}")
+                row[col] = valor
+
+            total += 1
+            yield row
+
+        if total == 0:
+            raise ValueError("Arquivo excel está vazio.")
+        for col in required_cols:
+            if col not in preenchidas:
+                raise ValueError(f"Coluna obrigatória '{col}' está completamente vazia.")
+    finally:
+        wb.close()
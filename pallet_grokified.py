@@ -6,6 +6,14 @@ from pathlib import Path
 import textwrap
 from datetime import datetime
 import logging
+import argparse
+import itertools
+from collections import Counter
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from leitura_excel import iter_linhas_excel, contar_linhas, texto
+from pdf_partes import renderizar_em_partes
 
 # Configure logging
 logging.basicConfig(filename='labels.log', level=logging.DEBUG, format='%(message)s')
@@ -25,33 +33,56 @@ DEFAULT_CONFIG = {
     "border_thickness": 3  # Added for explicit control
 }
 
+@lru_cache(maxsize=4096)
+def wrap_upper(text, width):
+    """Wrapped, upper-cased lines for a field; cached since batch runs repeat addresses."""
+    return tuple(textwrap.wrap(text.upper(), width=width))
+
 def draw_wrapped_text(canvas, text, x, y, prefix, width, font, font_size, max_lines=3):
     """Draw wrapped text on the canvas, returning the new y position."""
     canvas.setFont(font, font_size)
-    wrapped = textwrap.wrap(str(text).upper(), width=width)
+    wrapped = wrap_upper(str(text), width)
     if len(wrapped) > max_lines:
         raise ValueError(f"Text too long for {prefix}: {text}")
     for i, line in enumerate(wrapped):
         canvas.drawString(x, y - i * 5 * mm, f"{prefix}: {line}" if i == 0 else line)
     return y - len(wrapped) * 5 * mm
 
-def generate_shipping_labels_from_excel(excel_file, output_file=None, config=None):
-    """
-    Generate shipping labels from an Excel file as a PDF.
+REQUIRED_COLS = ["Cliente", "Rua", "Bairro", "Cidade", "NF", "Transportadora"]
 
-    Args:
-        excel_file (str): Path to the Excel file with label data.
-        output_file (str, optional): Output PDF file path. Defaults to timestamped filename.
-        config (dict, optional): Configuration for page size, fonts, and layout.
+def draw_pallet_label(c, label, config, i=None):
+    """Draw one pallet label on the current page of the canvas."""
+    # Save canvas state
+    c.saveState()
 
-    Raises:
-        FileNotFoundError: If the Excel file is not found.
-        ValueError: If required columns are missing or data is invalid.
-    """
-    # Use default config if none provided
-    config = config or DEFAULT_CONFIG
+    # Set border thickness for each page
+    c.setLineWidth(config["border_thickness"])
+    if i is not None:
+        logging.debug(f"Label {i}: Setting line width to {config['border_thickness']}")
 
-    # Load Excel file
+    # Draw border
+    c.rect(config["border_margin"], config["border_margin"], config["border_width"], config["border_height"])
+
+    y = config["start_y"]
+    # Draw wrapped text fields
+    y = draw_wrapped_text(c, label["Cliente"], 10 * mm, y, "Cliente", config["text_widths"]["Cliente"], *config["font_title"])
+    y = draw_wrapped_text(c, label["Rua"], 10 * mm, y - config["line_spacing"], "Rua", config["text_widths"]["Rua"], *config["font_body"])
+    y -= config["line_spacing"]
+    c.setFont(*config["font_body"])
+    c.drawString(10 * mm, y, f"Bairro: {str(label['Bairro']).upper()}")
+    y -= config["large_spacing"]
+    c.drawString(10 * mm, y, f"Cidade: {str(label['Cidade']).upper()}")
+    y -= config["large_spacing"]
+    c.drawString(10 * mm, y, f"NF: {str(label['NF'])}")
+    y -= config["large_spacing"]
+    c.drawString(10 * mm, y, f"Transp: {str(label['Transportadora']).upper()}")
+
+    # Restore canvas state
+    c.restoreState()
+    c.showPage()
+
+def read_labels_dataframe(excel_file):
+    """Load every label row at once with pandas (non-streaming mode)."""
     try:
         df = pd.read_excel(excel_file)
     except FileNotFoundError:
@@ -63,63 +94,246 @@ def generate_shipping_labels_from_excel(excel_file, output_file=None, config=Non
         raise ValueError("Arquivo excel está vazio.")
 
     # Check required columns
-    required_cols = ["Cliente", "Rua", "Bairro", "Cidade", "NF", "Transportadora"]
-    for col in required_cols:
+    for col in REQUIRED_COLS:
         if col not in df.columns:
             raise ValueError(f"Colunas faltando no arquivo: {col}")
         if df[col].isna().any():
             raise ValueError(f"Coluna {col} está vazia.")
 
-    # Log dataset size
-    logging.debug(f"Processing {len(df)} labels from {excel_file}")
-    if len(df) > 1000:
-        logging.warning(f"Large dataset ({len(df)} rows) may increase processing time.")
+    return len(df), iter(df.to_dict(orient="records"))
+
+def read_labels_streaming(excel_file):
+    """Iterate label rows straight from the xlsx in read-only mode."""
+    rows = iter_linhas_excel(excel_file, REQUIRED_COLS, {"NF": texto}, permitir_vazio=False)
+    return contar_linhas(excel_file), rows
+
+def generate_shipping_labels_from_excel(excel_file, output_file=None, config=None, streaming=True,
+                                        pages_per_part=None, resume=False):
+    """
+    Generate shipping labels from an Excel file as a PDF.
+
+    Args:
+        excel_file (str): Path to the Excel file with label data.
+        output_file (str, optional): Output PDF file path. Defaults to timestamped filename.
+        config (dict, optional): Configuration for page size, fonts, and layout.
+        streaming (bool, optional): Read and validate rows one at a time with
+            openpyxl in read-only mode, drawing each as soon as it is read.
+            When False, the whole sheet is loaded with pandas first.
+        pages_per_part (int, optional): Save every N labels to a part file on
+            disk as soon as they are drawn and join the parts at the end.
+        resume (bool, optional): With pages_per_part, continue an interrupted
+            run from the parts already saved for the same output_file.
+
+    Raises:
+        FileNotFoundError: If the Excel file is not found.
+        ValueError: If required columns are missing or data is invalid.
+    """
+    # Use default config if none provided
+    config = config or DEFAULT_CONFIG
+
+    # Load Excel file
+    if streaming:
+        total_rows, labels = read_labels_streaming(excel_file)
+    else:
+        total_rows, labels = read_labels_dataframe(excel_file)
 
-    # Convert dataframe to list of dicts
-    labels = df.to_dict(orient="records")
+    # Log dataset size
+    logging.debug(f"Processing {total_rows} labels from {excel_file}")
+    if total_rows and total_rows > 1000:
+        logging.warning(f"Large dataset ({total_rows} rows) may increase processing time.")
 
     # Default output filename
     output_path = Path(output_file if output_file else f"etiquetas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
 
     # Setup PDF
     try:
-        c = canvas.Canvas(str(output_path), pagesize=landscape((config["page_width"], config["page_height"])))
-        
-        for i, label in enumerate(labels, 1):
-            # Save canvas state
-            c.saveState()
-            
-            # Set border thickness for each page
-            c.setLineWidth(config["border_thickness"])
-            logging.debug(f"Label {i}: Setting line width to {config['border_thickness']}")
-            
-            # Draw border
-            c.rect(config["border_margin"], config["border_margin"], config["border_width"], config["border_height"])
-
-            y = config["start_y"]
-            # Draw wrapped text fields
-            y = draw_wrapped_text(c, label["Cliente"], 10 * mm, y, "Cliente", config["text_widths"]["Cliente"], *config["font_title"])
-            y = draw_wrapped_text(c, label["Rua"], 10 * mm, y - config["line_spacing"], "Rua", config["text_widths"]["Rua"], *config["font_body"])
-            y -= config["line_spacing"]
-            c.setFont(*config["font_body"])
-            c.drawString(10 * mm, y, f"Bairro: {str(label['Bairro']).upper()}")
-            y -= config["large_spacing"]
-            c.drawString(10 * mm, y, f"Cidade: {str(label['Cidade']).upper()}")
-            y -= config["large_spacing"]
-            c.drawString(10 * mm, y, f"NF: {str(label['NF'])}")
-            y -= config["large_spacing"]
-            c.drawString(10 * mm, y, f"Transp: {str(label['Transportadora']).upper()}")
-            
-            # Restore canvas state
-            c.restoreState()
-            c.showPage()
-
-        c.save()
+        pagesize = landscape((config["page_width"], config["page_height"]))
+        if pages_per_part:
+            renderizar_em_partes(enumerate(labels, 1), lambda c, item: draw_pallet_label(c, item[1], config, item[0]),
+                                 output_path, pagesize, pages_per_part, resume)
+        else:
+            c = canvas.Canvas(str(output_path), pagesize=pagesize)
+
+            for i, label in enumerate(labels, 1):
+                draw_pallet_label(c, label, config, i)
+
+            c.save()
         print(f"PDF gerado com sucesso: {output_path.resolve()}")
         logging.debug(f"Generated PDF: {output_path.resolve()}")
     except Exception as e:
         logging.error(f"Failed to generate PDF: {str(e)}")
         raise
 
+def find_pallet_sheets(sources):
+    """Expand files and directories into the list of pallet sheets to load."""
+    files = []
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            files.extend(sorted(f for f in path.glob("*.xlsx") if not f.name.startswith("~")))
+        elif path.exists():
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"Arquivo excel não encontrado: {source}")
+    if not files:
+        raise ValueError("Nenhuma planilha de pallet encontrada.")
+    return files
+
+def shipment_key(label):
+    return tuple(str(label[col]).strip().upper() for col in REQUIRED_COLS)
+
+def load_pallet_sheet(path):
+    """Read one pallet sheet into a list of labels (runs in a worker process)."""
+    _, rows = read_labels_streaming(path)
+    return list(rows)
+
+def load_pallet_batch(files, max_workers=4):
+    """
+    Load every sheet and merge them into one sorted label list.
+
+    Reading a sheet with openpyxl is pure Python and holds the GIL, so with
+    more than one sheet they are read in separate processes.
+
+    Repeated rows inside one sheet are separate pallets of the same shipment and
+    are kept. The same shipment found in several sheets (a sheet saved twice,
+    or copied into the day's folder again) is only counted once, using the
+    largest number of pallets any single sheet lists for it.
+    """
+    workers = min(max_workers or 1, len(files))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            sheets = list(executor.map(load_pallet_sheet, files))
+    else:
+        sheets = [load_pallet_sheet(path) for path in files]
+
+    pallets = Counter()
+    first_seen = {}
+    for rows in sheets:
+        per_sheet = Counter()
+        for label in rows:
+            key = shipment_key(label)
+            per_sheet[key] += 1
+            first_seen.setdefault(key, label)
+        for key, count in per_sheet.items():
+            pallets[key] = max(pallets[key], count)
+
+    total_rows = sum(len(rows) for rows in sheets)
+    ordered = sorted(first_seen, key=lambda k: (
+        k[REQUIRED_COLS.index("Transportadora")],
+        k[REQUIRED_COLS.index("Cidade")],
+        k[REQUIRED_COLS.index("Cliente")],
+        k[REQUIRED_COLS.index("NF")],
+    ))
+    labels = [first_seen[key] for key in ordered for _ in range(pallets[key])]
+    return labels, total_rows
+
+def draw_carrier_separator(c, carrier, labels, config):
+    """Draw a separator page announcing the labels of one carrier."""
+    c.saveState()
+    c.setLineWidth(config["border_thickness"])
+    c.rect(config["border_margin"], config["border_margin"], config["border_width"], config["border_height"])
+
+    y = config["start_y"]
+    c.setFont("Helvetica-Bold", 22)
+    for line in wrap_upper(str(carrier), 22):
+        c.drawString(10 * mm, y, line)
+        y -= 10 * mm
+
+    c.setFont(*config["font_body"])
+    cities = sorted({str(label["Cidade"]).upper() for label in labels})
+    c.drawString(10 * mm, y - config["line_spacing"], f"{len(labels)} etiquetas de pallet")
+    y -= config["large_spacing"] + config["line_spacing"]
+    for city in cities[:4]:
+        c.drawString(10 * mm, y, city)
+        y -= config["line_spacing"]
+    if len(cities) > 4:
+        c.drawString(10 * mm, y, f"... e mais {len(cities) - 4} cidades")
+
+    c.restoreState()
+    c.showPage()
+
+def batch_pages(labels):
+    """Pages of a batch run in order: a separator before each carrier, then its labels."""
+    carrier_key = REQUIRED_COLS.index("Transportadora")
+    for _, group in itertools.groupby(labels, key=lambda label: shipment_key(label)[carrier_key]):
+        group = list(group)
+        yield "separator", group
+        for label in group:
+            yield "label", label
+
+def draw_batch_page(c, page, config):
+    kind, payload = page
+    if kind == "separator":
+        draw_carrier_separator(c, payload[0]["Transportadora"], payload, config)
+    else:
+        draw_pallet_label(c, payload, config)
+
+def generate_pallet_labels_batch(sources, output_file=None, config=None, max_workers=4,
+                                 pages_per_part=None, resume=False):
+    """
+    Generate one merged PDF with the pallet labels of many sheets.
+
+    Labels are de-duplicated, grouped by Transportadora and Cidade, and each
+    carrier starts with a separator page.
+
+    Args:
+        sources (list): Pallet sheets and/or directories containing them.
+        output_file (str, optional): Output PDF file path. Defaults to timestamped filename.
+        config (dict, optional): Configuration for page size, fonts, and layout.
+        max_workers (int, optional): Processes used to read the sheets.
+        pages_per_part (int, optional): Save every N pages to disk as they are
+            drawn and join the parts at the end.
+        resume (bool, optional): With pages_per_part, continue an interrupted
+            run from the parts already saved for the same output_file.
+
+    Raises:
+        FileNotFoundError: If a source is not found.
+        ValueError: If no sheet is found or any sheet is invalid.
+    """
+    config = config or DEFAULT_CONFIG
+
+    files = find_pallet_sheets(sources)
+    labels, total_rows = load_pallet_batch(files, max_workers)
+    logging.debug(f"Processing {len(labels)} labels from {len(files)} sheets ({total_rows - len(labels)} duplicates removed)")
+
+    output_path = Path(output_file if output_file else f"etiquetas_pallet_lote_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
+
+    try:
+        pagesize = landscape((config["page_width"], config["page_height"]))
+        if pages_per_part:
+            renderizar_em_partes(batch_pages(labels), lambda c, page: draw_batch_page(c, page, config),
+                                 output_path, pagesize, pages_per_part, resume)
+        else:
+            c = canvas.Canvas(str(output_path), pagesize=pagesize)
+
+            for page in batch_pages(labels):
+                draw_batch_page(c, page, config)
+
+            c.save()
+        print(f"PDF gerado com sucesso: {output_path.resolve()}")
+        print(f"   → {len(files)} planilhas, {len(labels)} etiquetas, {total_rows - len(labels)} duplicadas ignoradas")
+        logging.debug(f"Generated PDF: {output_path.resolve()}")
+    except Exception as e:
+        logging.error(f"Failed to generate PDF: {str(e)}")
+        raise
+
 if __name__ == "__main__":
-    generate_shipping_labels_from_excel("Imprimir Etiqueta de Pallet.xlsx")
\ No newline at end of file
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="Gera etiquetas de pallet.")
+    parser.add_argument("--lote", nargs="+", metavar="PLANILHA_OU_PASTA",
+                        help="junta várias planilhas/pastas em um único PDF ordenado por transportadora")
+    parser.add_argument("--saida", help="PDF de saída (obrigatório com --retomar)")
+    parser.add_argument("--partes", type=int, metavar="N",
+                        help="grava cada N páginas em disco assim que ficam prontas")
+    parser.add_argument("--retomar", action="store_true",
+                        help="continua uma execução com --partes interrompida (mesmo --saida)")
+    args = parser.parse_args()
+
+    if args.retomar and not (args.saida and args.partes):
+        parser.error("--retomar precisa de --saida e --partes")
+
+    if args.lote:
+        generate_pallet_labels_batch(args.lote, args.saida, pages_per_part=args.partes, resume=args.retomar)
+    else:
+        generate_shipping_labels_from_excel("Imprimir Etiqueta de Pallet.xlsx", args.saida,
+                                            pages_per_part=args.partes, resume=args.retomar)
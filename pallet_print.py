@@ -5,8 +5,49 @@ import pandas as pd
 from pathlib import Path
 import textwrap
 from datetime import datetime
+import argparse
+from pdf_partes import renderizar_em_partes
 
-def generate_shipping_labels_from_excel(excel_file, output_file=None):
+def draw_label(c, label):
+    # Draw border
+    c.setLineWidth(3)
+    c.rect(2*mm, 2*mm, 140*mm, 90*mm)
+
+    y = 80*mm
+    c.setFont("Helvetica-Bold", 14)
+
+    # Wrap Cliente name
+    cliente_wrapped = textwrap.wrap(str(label["Cliente"]).upper(), width=35)
+
+    for i, line in enumerate(cliente_wrapped):
+        if i == 0:
+            c.drawString(10*mm, y, f"Cliente: {line}")
+        else:
+            c.drawString(10*mm, y, line)
+        y -= 5*mm
+    y -= 5*mm
+    c.setFont("Helvetica", 12)
+    rua_wrapped = textwrap.wrap(str(label["Rua"]), width=45)
+
+    for i, line in enumerate(rua_wrapped):
+        if i == 0:
+            c.drawString(10*mm, y, f"Rua: {line}")
+        else:
+            c.drawString(10*mm, y, line)
+        y -= 5*mm
+    y -= 5*mm
+    c.drawString(10*mm, y, f"Bairro: {label['Bairro']}")
+    y -= 10*mm
+    c.drawString(10*mm, y, f"Cidade: {label['Cidade']}")
+    y -= 10*mm
+    c.drawString(10*mm, y, f"NF: {label['NF']}")
+    y -= 10*mm
+    c.drawString(10*mm, y, f"Transp: {label['Transportadora']}")
+
+    # New page for next label
+    c.showPage()
+
+def generate_shipping_labels_from_excel(excel_file, output_file=None, pages_per_part=None, resume=False):
     # Load Excel file
     df = pd.read_excel(excel_file)
 
@@ -24,49 +65,32 @@ def generate_shipping_labels_from_excel(excel_file, output_file=None):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_file = f"etiquetas_{timestamp}.pdf"
 
-    # Setup PDF
-    c = canvas.Canvas(output_file, pagesize=landscape((100*mm, 150*mm)))
-
-    for label in labels:
-        # Draw border
-        c.setLineWidth(3)
-        c.rect(2*mm, 2*mm, 140*mm, 90*mm)
+    pagesize = landscape((100*mm, 150*mm))
 
-        y = 80*mm
-        c.setFont("Helvetica-Bold", 14)
+    if pages_per_part:
+        # Save every N labels to a part file and join them at the end
+        renderizar_em_partes(labels, draw_label, output_file, pagesize, pages_per_part, resume)
+    else:
+        # Setup PDF
+        c = canvas.Canvas(output_file, pagesize=pagesize)
 
-        # Wrap Cliente name
-        cliente_wrapped = textwrap.wrap(str(label["Cliente"]).upper(), width=35)
+        for label in labels:
+            draw_label(c, label)
 
-        for i, line in enumerate(cliente_wrapped):
-            if i == 0:
-                c.drawString(10*mm, y, f"Cliente: {line}")
-            else:
-                c.drawString(10*mm, y, line)
-            y -= 5*mm
-        y -= 5*mm
-        c.setFont("Helvetica", 12)
-        rua_wrapped = textwrap.wrap(str(label["Rua"]), width=45)
-
-        for i, line in enumerate(rua_wrapped):
-            if i == 0:
-                c.drawString(10*mm, y, f"Rua: {line}")
-            else:
-                c.drawString(10*mm, y, line)
-            y -= 5*mm
-        y -= 5*mm
-        c.drawString(10*mm, y, f"Bairro: {label['Bairro']}")
-        y -= 10*mm
-        c.drawString(10*mm, y, f"Cidade: {label['Cidade']}")
-        y -= 10*mm
-        c.drawString(10*mm, y, f"NF: {label['NF']}")
-        y -= 10*mm
-        c.drawString(10*mm, y, f"Transp: {label['Transportadora']}")
-
-        # New page for next label
-        c.showPage()
-
-    c.save()
+        c.save()
     print(f"PDF gerado com sucesso: {Path(output_file).resolve()}")
 
-generate_shipping_labels_from_excel("Imprimir Etiqueta de Pallet.xlsx")
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera etiquetas de pallet.")
+    parser.add_argument("--saida", help="PDF de saída (obrigatório com --retomar)")
+    parser.add_argument("--partes", type=int, metavar="N",
+                        help="grava cada N páginas em disco assim que ficam prontas")
+    parser.add_argument("--retomar", action="store_true",
+                        help="continua uma execução com --partes interrompida (mesmo --saida)")
+    args = parser.parse_args()
+
+    if args.retomar and not (args.saida and args.partes):
+        parser.error("--retomar precisa de --saida e --partes")
+
+    generate_shipping_labels_from_excel("Imprimir Etiqueta de Pallet.xlsx", args.saida,
+                                        pages_per_part=args.partes, resume=args.retomar)
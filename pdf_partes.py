@@ -0,0 +1,204 @@
+"""
+Renderização de etiquetas em arquivos-parte, para trabalhos muito grandes.
+
+O canvas do reportlab guarda todas as páginas em memória até o save(). Aqui
+cada bloco de N etiquetas vira um PDF-parte salvo em disco assim que fica
+pronto, e as partes são juntadas no arquivo final no fim. Um manifesto na
+pasta das partes registra quantas etiquetas já estão salvas, então uma
+execução interrompida pode ser retomada a partir da etiqueta seguinte.
+"""
+import gc
+import itertools
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+
+from reportlab.pdfgen import canvas
+
+DEFAULT_PAGINAS_POR_PARTE = 500
+
+
+def pasta_partes(output_path):
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.stem + ".partes")
+
+
+def _ler_manifesto(pasta):
+    manifesto = pasta / "manifesto.json"
+    if manifesto.exists():
+        return json.loads(manifesto.read_text(encoding="utf-8"))
+    return {"etiquetas": 0, "partes": []}
+
+
+def _gravar_manifesto(pasta, dados):
+    temporario = pasta / "manifesto.json.tmp"
+    temporario.write_text(json.dumps(dados, indent=4), encoding="utf-8")
+    os.replace(temporario, pasta / "manifesto.json")
+
+
+def _renumerar(obj, novo_id):
+    """
+    Troca, no lugar, as referências do objeto pelos números do arquivo final.
+
+    Referências sem documento de origem (pdf=None) já apontam para o arquivo
+    final e são mantidas.
+    """
+    from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject
+
+    if isinstance(obj, IndirectObject):
+        if obj.pdf is None:
+            return obj
+        return IndirectObject(novo_id(obj), 0, None)
+    if isinstance(obj, DictionaryObject):
+        for chave, valor in list(obj.items()):
+            obj[chave] = _renumerar(valor, novo_id)
+    elif isinstance(obj, ArrayObject):
+        for i, valor in enumerate(obj):
+            obj[i] = _renumerar(valor, novo_id)
+    return obj
+
+
+def juntar_partes(partes, output_path):
+    """
+    Junta os PDFs-parte, na ordem, no arquivo final.
+
+    Os objetos de cada parte são copiados direto para o arquivo de saída, sem
+    montar o documento inteiro em memória (o PdfWriter do pypdf guardaria
+    todas as páginas até o fim, que é justamente o que as partes evitam).
+    """
+    try:
+        from pypdf import PdfReader
+        from pypdf.generic import IndirectObject, NameObject
+    except ImportError:
+        raise RuntimeError(
+            "pypdf não instalado: as partes foram mantidas em "
+            f"{pasta_partes(output_path)} e podem ser juntadas depois (pip install pypdf)."
+        )
+
+    # Objetos 1 e 2 ficam reservados para a árvore de páginas e o catálogo
+    offsets = [None, None]
+    kids = []
+    paginas = set()
+    raiz_paginas = IndirectObject(1, 0, None)
+
+    temporario = Path(output_path).with_suffix(".pdf.tmp")
+    with open(temporario, "wb") as out:
+        out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+        for parte in partes:
+            reader = PdfReader(str(parte))
+            mapa = {}
+            pendentes = []
+
+            def novo_id(ref):
+                if ref.idnum not in mapa:
+                    offsets.append(None)
+                    mapa[ref.idnum] = len(offsets)
+                    pendentes.append(ref)
+                return mapa[ref.idnum]
+
+            for page in reader.pages:
+                kids.append(novo_id(page.indirect_reference))
+                paginas.add(kids[-1])
+
+            while pendentes:
+                ref = pendentes.pop()
+                obj = ref.get_object()
+                numero = mapa[ref.idnum]
+                if numero in paginas:
+                    # A página passa a apontar para a árvore do arquivo final
+                    # antes de renumerar, então o /Pages e o /Root da parte
+                    # nunca são alcançados nem copiados. O PageObject de
+                    # reader.pages é uma cópia: a troca é feita no objeto lido.
+                    obj[NameObject("/Parent")] = raiz_paginas
+                obj = _renumerar(obj, novo_id)
+                if numero in paginas and obj.raw_get("/Parent") != raiz_paginas:
+                    raise RuntimeError(f"Página {numero} de {parte} fora da árvore de páginas do arquivo final")
+                offsets[numero - 1] = out.tell()
+                out.write(f"{numero} 0 obj\n".encode())
+                obj.write_to_stream(out)
+                out.write(b"\nendobj\n")
+
+            # Os objetos do pypdf têm ciclos com o reader: libera a parte já
+            # copiada antes de abrir a próxima
+            del reader, page, obj
+            gc.collect()
+
+        offsets[0] = out.tell()
+        refs = " ".join(f"{k} 0 R" for k in kids)
+        out.write(f"1 0 obj\n<< /Type /Pages /Count {len(kids)} /Kids [{refs}] >>\nendobj\n".encode())
+        offsets[1] = out.tell()
+        out.write(b"2 0 obj\n<< /Type /Catalog /Pages 1 0 R >>\nendobj\n")
+
+        inicio_xref = out.tell()
+        out.write(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+        for offset in offsets:
+            out.write(f"{offset:010d} 00000 n \n".encode())
+        out.write(f"trailer\n<< /Size {len(offsets) + 1} /Root 2 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n".encode())
+
+    os.replace(temporario, output_path)
+
+
+def renderizar_em_partes(labels, draw, output_path, pagesize,
+                         paginas_por_parte=DEFAULT_PAGINAS_POR_PARTE, retomar=False):
+    """
+    Desenha as etiquetas em PDFs-parte e junta tudo em output_path.
+
+    Args:
+        labels (iterable): Etiquetas na ordem de impressão (uma página cada).
+        draw (callable): draw(canvas, label) desenha uma etiqueta e chama showPage().
+        output_path (str | Path): PDF final.
+        pagesize (tuple): Tamanho da página.
+        paginas_por_parte (int): Etiquetas por arquivo-parte.
+        retomar (bool): Reaproveita as partes já salvas de uma execução
+            interrompida e continua a partir da etiqueta seguinte.
+
+    Returns:
+        int: Total de etiquetas no PDF final.
+    """
+    output_path = Path(output_path)
+    pasta = pasta_partes(output_path)
+
+    if pasta.exists() and not retomar:
+        shutil.rmtree(pasta)
+    pasta.mkdir(exist_ok=True)
+
+    manifesto = _ler_manifesto(pasta)
+    if manifesto["partes"] and manifesto.get("paginas_por_parte") not in (None, paginas_por_parte):
+        paginas_por_parte = manifesto["paginas_por_parte"]
+    manifesto["paginas_por_parte"] = paginas_por_parte
+
+    labels = iter(labels)
+    concluidas = manifesto["etiquetas"]
+    if concluidas:
+        print(f"Retomando a partir da etiqueta {concluidas + 1} ({len(manifesto['partes'])} partes já salvas).")
+        pulados = sum(1 for _ in itertools.islice(labels, concluidas))
+        if pulados < concluidas:
+            raise ValueError(f"A planilha tem só {pulados} etiquetas, mas {concluidas} já estavam salvas.")
+
+    while True:
+        bloco = list(itertools.islice(labels, paginas_por_parte))
+        if not bloco:
+            break
+
+        numero = len(manifesto["partes"]) + 1
+        parte = pasta / f"parte_{numero:05d}.pdf"
+        temporario = parte.with_suffix(".tmp")
+
+        c = canvas.Canvas(str(temporario), pagesize=pagesize)
+        for label in bloco:
+            draw(c, label)
+        c.save()
+        os.replace(temporario, parte)
+
+        manifesto["partes"].append({"arquivo": parte.name, "inicio": concluidas + 1, "fim": concluidas + len(bloco)})
+        concluidas += len(bloco)
+        manifesto["etiquetas"] = concluidas
+        _gravar_manifesto(pasta, manifesto)
+        logging.debug(f"Saved {parte.name}: labels {concluidas - len(bloco) + 1}-{concluidas}")
+
+    juntar_partes([pasta / p["arquivo"] for p in manifesto["partes"]], output_path)
+    shutil.rmtree(pasta)
+    return concluidas
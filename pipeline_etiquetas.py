@@ -0,0 +1,166 @@
+"""
+Gera, em uma única execução, as etiquetas de caixa e de pallet de um pedido.
+
+O PDF do pedido é lido uma vez só (tags_clean2). As caixas saem da base de
+capacidades, como na planilha de caixas, e as etiquetas de pallet são
+preenchidas com o cliente do pedido e o endereço/transportadora cadastrados
+em BASE/clientes_transportadoras.xlsx:
+
+    Cliente | Rua | Bairro | Cidade | Transportadora
+
+Os dois PDFs são desenhados no mesmo laço, com o mesmo tamanho de página, sem
+passar pela planilha de caixas nem por "Imprimir Etiqueta de Pallet.xlsx".
+
+Uso:
+    python pipeline_etiquetas.py --nf 123456 --pallets 3
+"""
+import argparse
+import itertools
+import re
+from datetime import datetime
+from pathlib import Path
+
+from reportlab.lib.pagesizes import landscape
+from reportlab.pdfgen import canvas
+
+import pallet_grokified
+import tags_clean2
+import tags_print_from_excel
+from indice_jobs import registrar_job
+from leitura_excel import iter_linhas_excel, texto
+
+COLUNAS_TRANSPORTADORAS = ["Cliente", "Rua", "Bairro", "Cidade", "Transportadora"]
+
+
+def chave_cliente(nome):
+    return re.sub(r"\s+", " ", str(nome)).strip().upper()
+
+
+def carregar_transportadoras(arquivo):
+    """Lê o cadastro de clientes e retorna o mapa cliente → endereço/transportadora."""
+    arquivo = Path(arquivo)
+    if not arquivo.exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {arquivo.name}")
+
+    conversores = {col: texto for col in COLUNAS_TRANSPORTADORAS}
+    linhas = iter_linhas_excel(arquivo, COLUNAS_TRANSPORTADORAS, conversores, permitir_vazio=False)
+    return {chave_cliente(linha["Cliente"]): linha for linha in linhas}
+
+
+def etiquetas_pallet(client_name, pedido, transportadoras, nf=None, pallets=1):
+    """
+    Monta as etiquetas de pallet do pedido a partir do cadastro do cliente.
+
+    Sem nf, a etiqueta sai com o número do pedido no lugar da nota fiscal.
+    """
+    cadastro = transportadoras.get(chave_cliente(client_name))
+    if cadastro is None:
+        raise ValueError(f"Cliente sem endereço/transportadora cadastrado: {client_name}")
+
+    label = {
+        "Cliente": client_name,
+        "Rua": cadastro["Rua"],
+        "Bairro": cadastro["Bairro"],
+        "Cidade": cadastro["Cidade"],
+        "NF": nf or f"PED. {pedido}",
+        "Transportadora": cadastro["Transportadora"],
+    }
+    return [dict(label) for _ in range(pallets)]
+
+
+def gerar_etiquetas_pedido(input_file, base_dir, nf=None, pallets=1, modo="completo", backend="pdfplumber",
+                           box_config=None, pallet_config=None):
+    """
+    Lê o pedido uma vez e gera os PDFs de etiquetas de caixa e de pallet.
+
+    Args:
+        input_file (str | Path): PDF do pedido.
+        base_dir (Path): Pasta com base_quantities.xlsx e clientes_transportadoras.xlsx.
+        nf (str, optional): Nota fiscal impressa nas etiquetas de pallet.
+        pallets (int): Quantidade de etiquetas de pallet.
+        modo, backend: Repassados para tags_clean2.ler_pdf.
+        box_config, pallet_config (dict, optional): Layouts das etiquetas
+            (DEFAULT_CONFIG de tags_print_from_excel e pallet_grokified).
+
+    Returns:
+        tuple: (pdf_caixas, pdf_pallets, total_caixas).
+    """
+    box_config = box_config or tags_print_from_excel.DEFAULT_CONFIG
+    pallet_config = pallet_config or pallet_grokified.DEFAULT_CONFIG
+
+    # As duas etiquetas usam a mesma folha 150 x 100 mm deitada
+    pagesize = landscape((box_config["page_width"], box_config["page_height"]))
+    if landscape((pallet_config["page_width"], pallet_config["page_height"])) != pagesize:
+        raise ValueError("Etiquetas de caixa e de pallet precisam do mesmo tamanho de página.")
+
+    capacidade_por_produto = tags_clean2.carregar_capacidades(base_dir / "base_quantities.xlsx")
+    transportadoras = carregar_transportadoras(base_dir / "clientes_transportadoras.xlsx")
+
+    header_lines, lines_by_page = tags_clean2.ler_pdf(input_file, modo, backend)
+    client_name, pedido = tags_clean2.extrair_cabecalho(header_lines, lines_by_page)
+    ordem_prod = tags_clean2.extrair_produtos(lines_by_page)
+    if ordem_prod.empty:
+        raise ValueError("Nenhum produto encontrado no PDF.")
+
+    caixas = tags_clean2.gerar_pacotes(ordem_prod, capacidade_por_produto, client_name, pedido).to_dict(orient="records")
+    pallets_labels = etiquetas_pallet(client_name, pedido, transportadoras, nf, pallets)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    pdf_caixas = Path(f"etiquetas_pedido_{pedido}_{timestamp}.pdf")
+    pdf_pallets = Path(f"etiquetas_pallet_pedido_{pedido}_{timestamp}.pdf")
+
+    c_caixas = canvas.Canvas(str(pdf_caixas), pagesize=pagesize)
+    c_pallets = canvas.Canvas(str(pdf_pallets), pagesize=pagesize)
+
+    for caixa, pallet in itertools.zip_longest(caixas, pallets_labels):
+        if caixa is not None:
+            tags_print_from_excel.draw_box_label(c_caixas, caixa, box_config)
+        if pallet is not None:
+            pallet_grokified.draw_pallet_label(c_pallets, pallet, pallet_config)
+
+    c_caixas.save()
+    c_pallets.save()
+
+    try:
+        registrar_job("etiquetas", pdf_caixas, caixas, pedido, client_name)
+    except Exception as e:
+        print(f"Aviso: não foi possível registrar no índice de trabalhos: {e}")
+
+    return pdf_caixas, pdf_pallets, len(caixas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera as etiquetas de caixa e de pallet direto do PDF do pedido.")
+    parser.add_argument("pedido_pdf", nargs="?", help="PDF do pedido (padrão: primeiro PDF da pasta do aplicativo)")
+    parser.add_argument("--nf", type=texto, help="nota fiscal das etiquetas de pallet (padrão: número do pedido)")
+    parser.add_argument("--pallets", type=int, default=1, help="quantidade de etiquetas de pallet")
+    parser.add_argument("--modo", choices=["recorte", "completo"], default="completo")
+    parser.add_argument("--backend", choices=[*tags_clean2.BACKENDS, "auto"], default="pdfplumber")
+    args = parser.parse_args()
+
+    if args.pallets < 1:
+        parser.error("--pallets precisa ser pelo menos 1")
+
+    app_dir = tags_clean2.get_app_dir()
+    if args.pedido_pdf:
+        input_file = Path(args.pedido_pdf)
+    else:
+        pdf_files = list(app_dir.glob("*.pdf"))
+        if not pdf_files:
+            raise FileNotFoundError("Nenhum arquivo PDF encontrado na pasta do aplicativo.")
+        input_file = pdf_files[0]
+
+    pdf_caixas, pdf_pallets, total = gerar_etiquetas_pedido(input_file, app_dir / "BASE", args.nf, args.pallets,
+                                                            args.modo, args.backend)
+
+    print("PRONTO!")
+    print(f"   {total} etiquetas de caixa: {pdf_caixas.resolve()}")
+    print(f"   {args.pallets} etiquetas de pallet: {pdf_pallets.resolve()}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print("\n❌ ERROR:", e)
+        input("\nPress Enter to close...")
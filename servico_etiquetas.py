@@ -0,0 +1,280 @@
+"""
+Serviço HTTP local para conversão de pedidos em etiquetas.
+
+Um único processo mantém a base de capacidades carregada e atende todas as
+estações de embalagem por meio de um pool limitado de workers:
+
+    POST /pedido?saida=xlsx|pdf|ambos   corpo: PDF do pedido/romaneio
+    POST /caixas                        corpo: planilha "Etiquetas Pedido ..."
+    GET  /saude                         status, capacidade e métricas (JSON)
+
+Uso:
+    python servico_etiquetas.py --porta 8765 --workers 4
+"""
+import argparse
+import io
+import json
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import tags_clean2
+from tags_print_from_excel import generate_shipping_labels_from_excel
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+DEFAULT_WORKERS = 4
+DEFAULT_FILA = 16
+DEFAULT_TIMEOUT = 120
+
+
+class ServicoOcupado(Exception):
+    """A fila do pool de workers está cheia."""
+
+
+class ServicoEtiquetas:
+    """
+    Núcleo do serviço, independente do HTTP.
+
+    Args:
+        base_file (str | Path): Caminho do base_quantities.xlsx.
+        workers (int): Número de conversões executadas em paralelo.
+        fila (int): Pedidos aguardando além dos que estão em execução.
+        timeout (float): Tempo máximo de espera por uma conversão, em segundos.
+        backend (str): Backend de extração de PDF (ver tags_clean2.BACKENDS, ou "auto").
+    """
+
+    def __init__(self, base_file, workers=DEFAULT_WORKERS, fila=DEFAULT_FILA, timeout=DEFAULT_TIMEOUT,
+                 backend="pdfplumber"):
+        self.base_file = Path(base_file)
+        self.backend = backend
+        self.workers = workers
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="etiquetas")
+        self._vagas = threading.BoundedSemaphore(workers + fila)
+        self._lock = threading.Lock()
+        self._capacidades = {}
+        self._base_mtime = None
+        self._metricas = {}
+        self._inicio = time.time()
+        self.capacidades()
+
+    # Base de capacidades
+
+    def capacidades(self):
+        """
+        Retorna o mapa de capacidades, relendo a base só se o arquivo mudou.
+
+        Raises:
+            FileNotFoundError: Se a base não existir (na partida ou depois).
+        """
+        try:
+            mtime = self.base_file.stat().st_mtime
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Base de capacidades não encontrada: {self.base_file}")
+        with self._lock:
+            if mtime != self._base_mtime:
+                self._capacidades = tags_clean2.carregar_capacidades(self.base_file)
+                self._base_mtime = mtime
+            return self._capacidades
+
+    # Conversões
+
+    def pedido_para_planilha(self, pdf_bytes):
+        """Converte o PDF do pedido em (nome do xlsx, bytes do xlsx, pedido)."""
+        capacidades = self.capacidades()
+        try:
+            header_lines, lines_by_page = tags_clean2.ler_pdf(io.BytesIO(pdf_bytes), backend=self.backend)
+        except Exception as e:
+            raise ValueError(f"PDF do pedido inválido: {e}")
+        client_name, pedido = tags_clean2.extrair_cabecalho(header_lines, lines_by_page)
+        ordem_prod = tags_clean2.extrair_produtos(lines_by_page)
+        if ordem_prod.empty:
+            raise ValueError("Nenhum produto encontrado no PDF.")
+
+        df_final = tags_clean2.gerar_pacotes(ordem_prod, capacidades, client_name, pedido)
+        df_final, _ = tags_clean2.adicionar_especificacoes(df_final)
+
+        buffer = io.BytesIO()
+        tags_clean2.salvar_excel(df_final, buffer)
+        return tags_clean2.nome_planilha(pedido), buffer.getvalue(), pedido
+
+    def caixas_para_etiquetas(self, xlsx_bytes):
+        """Converte a planilha de caixas no PDF de etiquetas."""
+        buffer = io.BytesIO()
+        generate_shipping_labels_from_excel(io.BytesIO(xlsx_bytes), buffer)
+        return buffer.getvalue()
+
+    def pedido_para_etiquetas(self, pdf_bytes, saida="pdf"):
+        """Retorna (nome, content-type, bytes) conforme a saída pedida."""
+        nome_xlsx, xlsx, pedido = self.pedido_para_planilha(pdf_bytes)
+        if saida == "xlsx":
+            return nome_xlsx, XLSX_MIME, xlsx
+
+        pdf = self.caixas_para_etiquetas(xlsx)
+        nome_pdf = f"etiquetas_pedido_{pedido}.pdf"
+        if saida == "pdf":
+            return nome_pdf, "application/pdf", pdf
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr(nome_xlsx, xlsx)
+            zf.writestr(nome_pdf, pdf)
+        return f"etiquetas_pedido_{pedido}.zip", "application/zip", buffer.getvalue()
+
+    # Pool e métricas
+
+    def executar(self, rota, func, *args):
+        """Executa func no pool, medindo o tempo de fila e de processamento."""
+        if not self._vagas.acquire(blocking=False):
+            self._registrar(rota, 0.0, 0.0, "ocupado")
+            raise ServicoOcupado("Fila de conversões cheia, tente novamente.")
+
+        chegada = time.perf_counter()
+        tempos = {}
+
+        def tarefa():
+            tempos["inicio"] = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                self._vagas.release()
+
+        status = "erro"
+        try:
+            resultado = self.executor.submit(tarefa).result(timeout=self.timeout)
+            status = "ok"
+            return resultado
+        except FutureTimeout:
+            status = "timeout"
+            raise
+        finally:
+            agora = time.perf_counter()
+            espera = tempos.get("inicio", agora) - chegada
+            self._registrar(rota, espera, agora - chegada, status)
+
+    def _registrar(self, rota, espera, total, status):
+        with self._lock:
+            m = self._metricas.setdefault(rota, {
+                "requisicoes": 0, "ok": 0, "erro": 0, "timeout": 0, "ocupado": 0,
+                "tempo_total_s": 0.0, "tempo_max_s": 0.0, "espera_total_s": 0.0,
+            })
+            m["requisicoes"] += 1
+            m[status] += 1
+            m["tempo_total_s"] += total
+            m["tempo_max_s"] = max(m["tempo_max_s"], total)
+            m["espera_total_s"] += espera
+
+    def metricas(self):
+        with self._lock:
+            rotas = {}
+            for rota, m in self._metricas.items():
+                rotas[rota] = dict(m, tempo_medio_s=m["tempo_total_s"] / m["requisicoes"])
+            return {
+                "status": "ok",
+                "uptime_s": round(time.time() - self._inicio, 1),
+                "workers": self.workers,
+                "produtos_na_base": len(self._capacidades),
+                "rotas": rotas,
+            }
+
+    def encerrar(self):
+        self.executor.shutdown(wait=True)
+
+
+class EtiquetasHandler(BaseHTTPRequestHandler):
+    servico = None  # ServicoEtiquetas, definido por criar_servidor()
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/saude":
+            return self._erro(404, "Rota não encontrada.")
+        self._responder(200, "application/json", json.dumps(self.servico.metricas()).encode("utf-8"))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        corpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not corpo:
+            return self._erro(400, "Corpo da requisição vazio.")
+
+        try:
+            if url.path == "/pedido":
+                saida = parse_qs(url.query).get("saida", ["pdf"])[0]
+                if saida not in ("xlsx", "pdf", "ambos"):
+                    return self._erro(400, f"Saída inválida: {saida}")
+                nome, tipo, dados = self.servico.executar(url.path, self.servico.pedido_para_etiquetas, corpo, saida)
+            elif url.path == "/caixas":
+                dados = self.servico.executar(url.path, self.servico.caixas_para_etiquetas, corpo)
+                nome, tipo = "etiquetas.pdf", "application/pdf"
+            else:
+                return self._erro(404, "Rota não encontrada.")
+        except ServicoOcupado as e:
+            return self._erro(503, str(e))
+        except FutureTimeout:
+            return self._erro(504, "Tempo limite de conversão excedido.")
+        except ValueError as e:
+            return self._erro(400, str(e))
+        except Exception as e:
+            return self._erro(500, f"Erro ao gerar etiquetas: {e}")
+
+        self._responder(200, tipo, dados, nome)
+
+    def _responder(self, codigo, tipo, dados, nome=None):
+        self.send_response(codigo)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(dados)))
+        if nome:
+            self.send_header("Content-Disposition", f'attachment; filename="{nome}"')
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _erro(self, codigo, mensagem):
+        self._responder(codigo, "application/json", json.dumps({"erro": mensagem}).encode("utf-8"))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def criar_servidor(host="127.0.0.1", porta=8765, servico=None, **kwargs):
+    """
+    Cria o servidor HTTP (sem iniciá-lo).
+
+    Com porta=0 o sistema escolhe uma porta livre, útil para testes com um
+    cliente local (servidor.server_address traz a porta escolhida).
+    """
+    servico = servico or ServicoEtiquetas(**kwargs)
+    handler = type("Handler", (EtiquetasHandler,), {"servico": servico})
+    servidor = ThreadingHTTPServer((host, porta), handler)
+    servidor.servico = servico
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço local de geração de etiquetas.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--fila", type=int, default=DEFAULT_FILA)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--backend", choices=[*tags_clean2.BACKENDS, "auto"], default="pdfplumber")
+    parser.add_argument("--base", default=str(tags_clean2.get_app_dir() / "BASE" / "base_quantities.xlsx"))
+    args = parser.parse_args()
+
+    servidor = criar_servidor(args.host, args.porta, base_file=args.base, workers=args.workers,
+                              fila=args.fila, timeout=args.timeout, backend=args.backend)
+    print(f"Serviço de etiquetas em http://{args.host}:{servidor.server_address[1]} "
+          f"({args.workers} workers, {len(servidor.servico.capacidades())} produtos na base)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servidor.servico.encerrar()
+
+
+if __name__ == "__main__":
+    main()
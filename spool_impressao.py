@@ -0,0 +1,337 @@
+"""
+Distribui um trabalho de etiquetas entre várias impressoras.
+
+O trabalho é dividido em lotes de páginas consecutivas sem separar as caixas
+de um mesmo produto (a não ser que o produto sozinho passe do tamanho do
+lote). Os lotes são repartidos pela vazão medida de cada impressora e
+enviados em paralelo, um fluxo por impressora. Se uma impressora falha, ela
+sai do trabalho e os lotes dela são reenviados pelas que continuam
+funcionando; só é falha o lote que nenhuma impressora conseguiu imprimir.
+
+Impressoras são configuradas em impressoras.json:
+
+    [
+        {"nome": "zebra1", "tipo": "socket", "host": "192.168.0.21", "porta": 9100},
+        {"nome": "expedicao", "tipo": "diretorio", "pasta": "//servidor/spool", "aguardar": true}
+    ]
+
+A vazão medida (páginas/s) é gravada de volta no mesmo arquivo a cada
+execução e usada para repartir o próximo trabalho. Só é medida quando o envio
+acompanha a impressão (socket, ou pasta com "aguardar"); nos outros casos vale
+o "vazao" configurado no arquivo.
+
+Uso:
+    python spool_impressao.py "Etiquetas Pedido 123 Data 20250101_1200.xlsx"
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from reportlab.lib.pagesizes import landscape
+from reportlab.pdfgen import canvas
+
+from tags_print_from_excel import DEFAULT_CONFIG, draw_box_label, read_labels_streaming
+
+DEFAULT_PAGINAS_POR_LOTE = 200
+DEFAULT_VAZAO = 1.0  # páginas/s assumidas para uma impressora nunca medida
+PESO_MEDICAO = 0.5   # peso da última medição na média móvel da vazão
+
+
+class Impressora(ABC):
+    """Destino de impressão com vazão medida em páginas por segundo."""
+
+    # O tempo de enviar() só reflete a impressora se o envio espera ela
+    # processar; senão o que se mede é a rede ou o disco
+    mede_vazao = False
+
+    def __init__(self, nome, vazao=None):
+        self.nome = nome
+        self.vazao = vazao or DEFAULT_VAZAO
+
+    @abstractmethod
+    def enviar(self, nome_arquivo, dados):
+        """Envia um PDF; qualquer exceção conta como falha da impressora."""
+
+    def registrar_envio(self, paginas, segundos):
+        if self.mede_vazao and segundos > 0:
+            medida = paginas / segundos
+            self.vazao = PESO_MEDICAO * medida + (1 - PESO_MEDICAO) * self.vazao
+
+    def to_dict(self):
+        return {"nome": self.nome, "vazao": round(self.vazao, 3)}
+
+
+class ImpressoraSocket(Impressora):
+    """Impressora de rede que aceita PDF cru na porta 9100 (JetDirect/RAW)."""
+
+    mede_vazao = True
+
+    def __init__(self, nome, host, porta=9100, timeout=60, vazao=None):
+        super().__init__(nome, vazao)
+        self.host = host
+        self.porta = porta
+        self.timeout = timeout
+
+    def enviar(self, nome_arquivo, dados):
+        # A impressora só aceita mais dados conforme processa, então o tempo
+        # de envio acompanha a velocidade real de impressão em lotes grandes
+        with socket.create_connection((self.host, self.porta), timeout=self.timeout) as sock:
+            sock.sendall(dados)
+            sock.shutdown(socket.SHUT_WR)
+
+    def to_dict(self):
+        return dict(super().to_dict(), tipo="socket", host=self.host, porta=self.porta, timeout=self.timeout)
+
+
+class ImpressoraDiretorio(Impressora):
+    """
+    Pasta de spool monitorada por uma fila de impressão.
+
+    Com aguardar=True o envio só termina quando a fila remove o arquivo da
+    pasta, o que faz a vazão medida refletir a impressora e não o disco.
+    """
+
+    def __init__(self, nome, pasta, aguardar=False, timeout=600, vazao=None):
+        super().__init__(nome, vazao)
+        self.pasta = Path(pasta)
+        self.aguardar = aguardar
+        self.timeout = timeout
+
+    @property
+    def mede_vazao(self):
+        return self.aguardar
+
+    def enviar(self, nome_arquivo, dados):
+        # Grava com outro nome e renomeia, para a fila nunca ler um PDF pela metade
+        destino = self.pasta / nome_arquivo
+        temporario = destino.with_suffix(".tmp")
+        temporario.write_bytes(dados)
+        os.replace(temporario, destino)
+
+        limite = time.monotonic() + self.timeout
+        while self.aguardar and destino.exists():
+            if time.monotonic() > limite:
+                raise TimeoutError(f"{destino.name} não foi consumido pela fila de {self.nome}")
+            time.sleep(0.5)
+
+    def to_dict(self):
+        return dict(super().to_dict(), tipo="diretorio", pasta=str(self.pasta), aguardar=self.aguardar,
+                    timeout=self.timeout)
+
+
+def carregar_impressoras(config_file):
+    try:
+        entradas = json.loads(Path(config_file).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Arquivo de impressoras não encontrado: {config_file}")
+
+    impressoras = []
+    for e in entradas:
+        if e.get("tipo") == "socket":
+            impressoras.append(ImpressoraSocket(e["nome"], e["host"], e.get("porta", 9100),
+                                                e.get("timeout", 60), vazao=e.get("vazao")))
+        elif e.get("tipo") == "diretorio":
+            impressoras.append(ImpressoraDiretorio(e["nome"], e["pasta"], e.get("aguardar", False),
+                                                   e.get("timeout", 600), vazao=e.get("vazao")))
+        else:
+            raise ValueError(f"Tipo de impressora desconhecido em {config_file}: {e.get('tipo')}")
+
+    if not impressoras:
+        raise ValueError(f"Nenhuma impressora configurada em {config_file}")
+    return impressoras
+
+
+def salvar_impressoras(config_file, impressoras):
+    Path(config_file).write_text(json.dumps([i.to_dict() for i in impressoras], indent=4), encoding="utf-8")
+
+
+def dividir_em_lotes(labels, paginas_por_lote=DEFAULT_PAGINAS_POR_LOTE):
+    """
+    Divide as etiquetas em lotes de páginas consecutivas.
+
+    Retorna uma lista de (primeira_pagina, etiquetas), com páginas numeradas a
+    partir de 1. As caixas de um produto só são separadas quando o produto
+    sozinho tem mais etiquetas do que paginas_por_lote.
+    """
+    lotes = []
+    atual = []
+    inicio = pagina = 1
+
+    for _, grupo in itertools.groupby(labels, key=lambda label: label["Produto"]):
+        grupo = list(grupo)
+        if atual and len(atual) + len(grupo) > paginas_por_lote:
+            lotes.append((inicio, atual))
+            atual, inicio = [], pagina
+
+        while len(grupo) > paginas_por_lote:
+            if atual:
+                lotes.append((inicio, atual))
+                atual, inicio = [], pagina
+            lotes.append((pagina, grupo[:paginas_por_lote]))
+            pagina += paginas_por_lote
+            grupo = grupo[paginas_por_lote:]
+            inicio = pagina
+
+        atual.extend(grupo)
+        pagina += len(grupo)
+
+    if atual:
+        lotes.append((inicio, atual))
+    return lotes
+
+
+def distribuir_lotes(lotes, impressoras):
+    """
+    Reparte os lotes pelas impressoras pela vazão de cada uma.
+
+    Os maiores lotes são atribuídos primeiro, sempre à impressora que
+    terminaria mais cedo; cada fila é depois reordenada por página.
+    """
+    filas = {i.nome: [] for i in impressoras}
+    termino = {i.nome: 0.0 for i in impressoras}
+
+    for lote in sorted(lotes, key=lambda lote: len(lote[1]), reverse=True):
+        impressora = min(impressoras, key=lambda i: termino[i.nome] + len(lote[1]) / i.vazao)
+        filas[impressora.nome].append(lote)
+        termino[impressora.nome] += len(lote[1]) / impressora.vazao
+
+    for fila in filas.values():
+        fila.sort(key=lambda lote: lote[0])
+    return filas
+
+
+def renderizar_lote(labels, config=None):
+    config = config or DEFAULT_CONFIG
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=landscape((config["page_width"], config["page_height"])))
+    for label in labels:
+        draw_box_label(c, label, config)
+    c.save()
+    return buffer.getvalue()
+
+
+def imprimir_em_paralelo(labels, impressoras, nome_trabalho="etiquetas",
+                         paginas_por_lote=DEFAULT_PAGINAS_POR_LOTE, config=None):
+    """
+    Divide, renderiza e envia um trabalho de etiquetas para várias impressoras.
+
+    Args:
+        labels (iterable): Etiquetas (dicts) na ordem da planilha de caixas.
+        impressoras (list): Instâncias de Impressora.
+        nome_trabalho (str): Prefixo dos arquivos enviados.
+        paginas_por_lote (int): Tamanho máximo de cada lote.
+        config (dict, optional): Layout das etiquetas (DEFAULT_CONFIG do tags_print_from_excel).
+
+    Uma impressora que falha para de receber lotes: o lote que falhou e os
+    que ainda estavam na fila dela passam para as outras impressoras. Um lote
+    só é dado como falha quando todas as impressoras falharam.
+
+    Returns:
+        dict: Por impressora, os intervalos de páginas enviados e os que
+        falharam (na última impressora que tentou o lote).
+    """
+    lotes = dividir_em_lotes(labels, paginas_por_lote)
+    filas = {nome: deque(fila) for nome, fila in distribuir_lotes(lotes, impressoras).items()}
+    resultado = {i.nome: {"enviados": [], "falhas": []} for i in impressoras}
+    reenviar = []  # (inicio, lote, {impressora: erro}) das impressoras que já falharam
+    ativas = {i.nome for i in impressoras}
+    ociosas = set()
+    cond = threading.Condition()
+
+    def proximo(nome):
+        with cond:
+            while nome in ativas:
+                if filas[nome]:
+                    inicio, lote = filas[nome].popleft()
+                    return inicio, lote, {}
+                for item in reenviar:
+                    if nome not in item[2]:
+                        reenviar.remove(item)
+                        return item
+                ociosas.add(nome)
+                # Se todas as ativas estão ociosas ninguém mais devolve lotes
+                if ativas <= ociosas:
+                    cond.notify_all()
+                    return None
+                cond.wait()
+                ociosas.discard(nome)
+            return None
+
+    def falhou(nome, inicio, lote, falhas, erro):
+        with cond:
+            ativas.discard(nome)
+            reenviar.append((inicio, lote, {**falhas, nome: erro}))
+            while filas[nome]:
+                ini, restante = filas[nome].popleft()
+                reenviar.append((ini, restante, {nome: erro}))
+            for item in list(reenviar):
+                ini, restante, falhas_item = item
+                if ativas <= falhas_item.keys():
+                    reenviar.remove(item)
+                    ultima, ultimo_erro = list(falhas_item.items())[-1]
+                    resultado[ultima]["falhas"].append((ini, ini + len(restante) - 1, ultimo_erro))
+            cond.notify_all()
+
+    def processar(impressora):
+        while (item := proximo(impressora.nome)) is not None:
+            inicio, lote, falhas = item
+            fim = inicio + len(lote) - 1
+            try:
+                dados = renderizar_lote(lote, config)
+                t0 = time.perf_counter()
+                impressora.enviar(f"{nome_trabalho}_p{inicio:05d}-{fim:05d}.pdf", dados)
+                impressora.registrar_envio(len(lote), time.perf_counter() - t0)
+            except Exception as e:
+                falhou(impressora.nome, inicio, lote, falhas, str(e))
+                continue
+            with cond:
+                resultado[impressora.nome]["enviados"].append((inicio, fim))
+
+    with ThreadPoolExecutor(max_workers=len(impressoras)) as executor:
+        list(executor.map(processar, impressoras))
+
+    for r in resultado.values():
+        r["falhas"].sort()
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Imprime etiquetas dividindo o trabalho entre várias impressoras.")
+    parser.add_argument("planilha", help='Planilha "Etiquetas Pedido ..." gerada pelo tags_clean2')
+    parser.add_argument("--impressoras", default="impressoras.json")
+    parser.add_argument("--paginas-por-lote", type=int, default=DEFAULT_PAGINAS_POR_LOTE)
+    args = parser.parse_args()
+
+    impressoras = carregar_impressoras(args.impressoras)
+    _, labels = read_labels_streaming(args.planilha)
+
+    inicio = time.perf_counter()
+    resultado = imprimir_em_paralelo(labels, impressoras, Path(args.planilha).stem, args.paginas_por_lote)
+    duracao = time.perf_counter() - inicio
+
+    salvar_impressoras(args.impressoras, impressoras)
+
+    falhas = 0
+    for impressora in impressoras:
+        r = resultado[impressora.nome]
+        paginas = sum(fim - ini + 1 for ini, fim in r["enviados"])
+        print(f"{impressora.nome}: {paginas} páginas em {len(r['enviados'])} lotes "
+              f"({impressora.vazao:.1f} páginas/s)")
+        for ini, fim, erro in r["falhas"]:
+            falhas += 1
+            print(f"   FALHOU páginas {ini}-{fim}: {erro}")
+
+    print(f"\nConcluído em {duracao:.1f}s" + (f" com {falhas} lotes a reimprimir." if falhas else "."))
+
+
+if __name__ == "__main__":
+    main()
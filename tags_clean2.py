@@ -1,10 +1,17 @@
+import argparse
+import json
+import os
 import sys
+import threading
+import time
 import pdfplumber
 import re
 import pandas as pd
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
 from openpyxl.styles import Alignment, Font
+from indice_jobs import registrar_job
 
 def get_app_dir() -> Path:
     if getattr(sys, 'frozen', False):
@@ -12,67 +19,299 @@ def get_app_dir() -> Path:
     return Path(__file__).parent
 
 # Regx Patterns
+#
+# Quantificadores possessivos (Python 3.11+) e lookbehinds mantêm a busca
+# linear mesmo em linhas longas que não casam (totais, lixo de OCR), sem mudar
+# as linhas aceitas nem os grupos extraídos pelos padrões originais:
+#   romaneio: ^\d+\s+\d+\s+(\d+)\s+(.*?)\s+(\d{1,3}(?:,\d{1,4})?)$
+#   pedido:   ^\s*\d+\s+(\d+)\s+(.+?)\s+(?:PC|UN|...)\s+([\d.,]+)
+# A descrição pode vir com espaços nas pontas; quem usa aplica .strip().
+
+pad_romaneio = r'^\d++\s++\d++\s++(\d++)\s(.*)\s(\d{1,3}(?:,\d{1,4})?)$'
+pad_pedido = (
+    r'^\s*+\d++\s++(\d++)'
+    r'(?:\s++|\s(?=\s\s))'           # descrição começa no 1º caractere visível (ou é só espaço)
+    r'(.+?)(?:(?<=\S)|(?<=\d\s\s))'  # e só pode terminar antes de um bloco de espaços
+    r'\s++(?:PC|UN|CT|JG|KG|LT|PAR|MT)\s++([\d.,]++)'
+)
+pad_descricao = r'(M\s?\d++|(?<!\d)\d++/\d++"?)\s*+[xX]\s*+(\d++)\s*+[xX]\s*+(\d++)\s*+([A-Z]{1,2})'
+
+# Table region extraction
+
+TOLERANCIA_LINHA = 3
+MARGEM_TABELA = 2
+
+def _agrupar_linhas(words):
+    """Agrupa palavras do pdfplumber em linhas de texto, na ordem da página."""
+    linhas = []
+    atual = []
+    topo = None
+
+    for w in sorted(words, key=lambda w: (round(w["top"]), w["x0"])):
+        if topo is not None and w["top"] - topo > TOLERANCIA_LINHA:
+            linhas.append(atual)
+            atual = []
+            topo = None
+        if topo is None:
+            topo = w["top"]
+        atual.append(w)
+    if atual:
+        linhas.append(atual)
+
+    return [
+        (
+            min(w["top"] for w in ws),
+            max(w["bottom"] for w in ws),
+            " ".join(w["text"] for w in sorted(ws, key=lambda w: w["x0"])),
+        )
+        for ws in linhas
+    ]
+
+
+def _linha_de_tabela(line):
+    return bool(re.search(pad_romaneio, line) or re.search(pad_pedido, line))
+
+
+def localizar_tabela(linhas, page_width, page_height):
+    """
+    Localiza a tabela de produtos a partir das linhas posicionadas de uma página.
+
+    Retorna o bbox da tabela, ou None se a página não tiver linhas de produto.
+    """
+    produtos = [(top, bottom) for top, bottom, text in linhas if _linha_de_tabela(text)]
+    if not produtos:
+        return None
+
+    topo = max(produtos[0][0] - MARGEM_TABELA, 0)
+    base = min(produtos[-1][1] + MARGEM_TABELA, page_height)
+    return (0, topo, page_width, base)
+
+
+def _ler_pdf_completo(pdf):
+    lines_by_page = []
+    all_lines = []
+
+    for page_num, page in enumerate(pdf.pages, 1):
+        page_text = page.extract_text()
+        if page_text:
+            page_lines = page_text.split("\n")
+            lines_by_page.append((page_num, page_lines))
+            all_lines.extend(page_lines)
+
+    return all_lines, lines_by_page
+
+
+def _ler_pdf_recorte(pdf):
+    # O pdfplumber interpreta a página inteira de qualquer forma, então o recorte
+    # é feito sobre as posições das palavras: page.crop() refiltraria todos os
+    # objetos da página e sai mais caro do que filtrar as palavras diretamente.
+    #
+    # Só o topo da tabela é aprendido por layout. A base nunca é reaproveitada:
+    # a quantidade de linhas muda de página para página e tudo abaixo do topo
+    # é sempre lido.
+    header_lines = []
+    lines_by_page = []
+    topos = {}
+
+    for page_num, page in enumerate(pdf.pages, 1):
+        layout = (round(page.width), round(page.height))
+        words = page.extract_words()
+        topo = topos.get(layout) if page_num > 1 else None
+
+        if topo is not None:
+            acima = _agrupar_linhas([w for w in words if w["top"] < topo])
+            if not any(_linha_de_tabela(text) for _, _, text in acima):
+                page_lines = [text for _, _, text in _agrupar_linhas([w for w in words if w["top"] >= topo])]
+                if page_lines:
+                    lines_by_page.append((page_num, page_lines))
+                continue
+            # Tabela começa acima do topo aprendido: localiza de novo nesta página
 
-pad_romaneio = r'^\d+\s+\d+\s+(\d+)\s+(.*?)\s+(\d{1,3}(?:,\d{1,4})?)$'
-pad_pedido = r'^\s*\d+\s+(\d+)\s+(.+?)\s+(?:PC|UN|CT|JG|KG|LT|PAR|MT)\s+([\d.,]+)'
+        # Primeira página ou layout ainda desconhecido: agrupa a página inteira uma vez
+        linhas = _agrupar_linhas(words)
+        bbox = localizar_tabela(linhas, page.width, page.height)
+        if bbox is not None:
+            page_lines = [text for top, _, text in linhas if top >= bbox[1]]
+            if page_num > 1:
+                topos[layout] = bbox[1]
+        else:
+            page_lines = [text for _, _, text in linhas]
 
-def main():
-    # Files aquisition
-    app_dir = get_app_dir()
+        if page_num == 1:
+            # Cabeçalho (Cliente / Pedido) só é lido na primeira página
+            topo = bbox[1] if bbox else float("inf")
+            header_lines = [text for top, _, text in linhas if top < topo]
 
-    pdf_files = list(app_dir.glob("*.pdf"))
+        if page_lines:
+            lines_by_page.append((page_num, page_lines))
 
-    if not pdf_files:
-        raise FileNotFoundError("Nenhum arquivo PDF encontrado na pasta do aplicativo.")
+    return header_lines, lines_by_page
 
-    input_file = pdf_files[0]
-    romaneio = input_file.stem
 
-    BASE_DIR = app_dir / "BASE"
-    BASE_FILE = BASE_DIR / "base_quantities.xlsx"
-    if not BASE_FILE.exists():
-        raise FileNotFoundError(f"Arquivo não encontrado: {BASE_FILE.name}")
+def _ler_pdfplumber(input_file, modo):
+    with pdfplumber.open(input_file) as pdf:
+        if modo == "completo":
+            return _ler_pdf_completo(pdf)
+        if modo == "recorte":
+            return _ler_pdf_recorte(pdf)
+    raise ValueError(f"Modo de extração desconhecido: {modo}")
 
-    # Load base quantities
 
-    try:
-        base_df = pd.read_excel(BASE_FILE, dtype={"Produto": str})
-    except Exception as e:
-        raise ValueError(f"Erro ao ler {BASE_FILE.name}: {e}")
+# O PDFium não é thread-safe: toda chamada ao pypdfium2 (inclusive o
+# fechamento de páginas e documentos) passa por este lock
+_pdfium_lock = threading.Lock()
 
-    required_cols = ["Produto", "Qtd.Embalagem"]
-    missing_cols = [c for c in required_cols if c not in base_df.columns]
-    if missing_cols:
-        raise ValueError(f"Colunas faltando em base_quantities.xlsx: {missing_cols}")
 
-    base_df["Produto"] = base_df["Produto"].str.zfill(8).str.strip()
-    capacidade_por_produto = base_df.set_index("Produto")["Qtd.Embalagem"].to_dict()
+def _ler_pdfium(input_file, modo):
+    # pypdfium2 já vem instalado junto com o pdfplumber. Extrai só o texto, sem
+    # montar objetos por caractere, então não há recorte: o modo é ignorado.
+    import pypdfium2 as pdfium
 
-    print(f"Base carregada: {len(capacidade_por_produto)} produtos definidos.")
-    print("Produtos sem capacidade definida usarão 10 peças por caixa.\n")
+    all_lines = []
+    lines_by_page = []
 
-    # Read PDF
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(input_file)
+        try:
+            for page_num in range(1, len(pdf) + 1):
+                page = pdf[page_num - 1]
+                textpage = page.get_textpage()
+                try:
+                    page_lines = textpage.get_text_bounded().splitlines()
+                finally:
+                    textpage.close()
+                    page.close()
+                if page_lines:
+                    lines_by_page.append((page_num, page_lines))
+                    all_lines.extend(page_lines)
+        finally:
+            pdf.close()
+
+    return all_lines, lines_by_page
+
+
+BACKENDS = {
+    "pdfplumber": _ler_pdfplumber,
+    "pdfium": _ler_pdfium,
+}
+
+
+def ler_pdf(input_file, modo="completo", backend="pdfplumber"):
+    """
+    Lê o PDF do pedido/romaneio.
+
+    Retorna (linhas_cabecalho, linhas_por_pagina). No pdfplumber, o modo
+    "completo" lê a página inteira com extract_text(); o modo "recorte"
+    aprende o topo da tabela uma vez por layout de página e descarta o que
+    fica acima dele. backend="auto" usa o backend mais rápido já validado
+    para o layout do documento (ver escolher_backend).
+    """
+    if backend == "auto":
+        backend = escolher_backend(input_file)
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de extração desconhecido: {backend}")
+    if hasattr(input_file, "seek"):
+        input_file.seek(0)
+    return BACKENDS[backend](input_file, modo)
+
+
+def layout_documento(input_file):
+    """Identifica o layout pelo gerador do PDF e pelo tamanho da primeira página."""
+    import pypdfium2 as pdfium
+
+    if hasattr(input_file, "seek"):
+        input_file.seek(0)
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(input_file)
+        try:
+            meta = pdf.get_metadata_dict()
+            largura, altura = 0, 0
+            if len(pdf):
+                page = pdf[0]
+                largura, altura = page.get_size()
+                page.close()
+        finally:
+            pdf.close()
+    return f"{meta.get('Producer', '')}|{meta.get('Creator', '')}|{round(largura)}x{round(altura)}"
+
+
+def comparar_backends(input_file, modo="completo"):
+    """
+    Mede cada backend no PDF e confere se extrai os mesmos dados da referência.
+
+    A referência é sempre o pdfplumber no modo "completo" (página inteira),
+    qualquer que seja o modo medido.
+
+    Retorna {backend: {"tempo": segundos, "identico": bool}}.
+    """
+    header_lines, lines_by_page = ler_pdf(input_file, "completo", "pdfplumber")
+    referencia = (extrair_produtos(lines_by_page), extrair_cabecalho(header_lines, lines_by_page))
+    resultados = {}
+
+    for nome in BACKENDS:
+        inicio = time.perf_counter()
+        try:
+            header_lines, lines_by_page = ler_pdf(input_file, modo, nome)
+        except ImportError:
+            continue
+        ordem_prod = extrair_produtos(lines_by_page)
+        tempo = time.perf_counter() - inicio
+        dados = (ordem_prod, extrair_cabecalho(header_lines, lines_by_page))
+
+        identico = dados[0].equals(referencia[0]) and dados[1] == referencia[1]
+        resultados[nome] = {"tempo": tempo, "identico": identico}
+
+    return resultados
+
+
+_backends_lock = threading.Lock()
+
+
+def escolher_backend(input_file, cache_file=None):
+    """
+    Escolhe o backend mais rápido para o layout do documento.
+
+    Na primeira vez que um layout aparece, todos os backends são medidos e só
+    os que extraem exatamente os mesmos produtos e cabeçalho do pdfplumber no
+    modo "completo" podem ser escolhidos. A escolha fica gravada em BASE/backends.json.
+    """
+    try:
+        layout = layout_documento(input_file)
+    except ImportError:
+        return "pdfplumber"
 
-    all_text = ""
-    lines_by_page = []
+    cache_file = Path(cache_file or get_app_dir() / "BASE" / "backends.json")
 
-    with pdfplumber.open(input_file) as pdf:
-        for page_num, page in enumerate(pdf.pages, 1):
-            page_text = page.extract_text()
-            if page_text:
-                page_lines = page_text.split("\n")
-                lines_by_page.append((page_num, page_lines))
-                all_text += page_text + "\n"
+    # Um layout novo é medido uma vez só, mesmo com várias threads do serviço
+    # recebendo o mesmo layout ao mesmo tempo
+    with _backends_lock:
+        cache = json.loads(cache_file.read_text(encoding="utf-8")) if cache_file.exists() else {}
+        if layout in cache:
+            return cache[layout]["backend"]
 
-    lines = all_text.split("\n")
+        resultados = comparar_backends(input_file)
+        validos = {nome: r["tempo"] for nome, r in resultados.items() if r["identico"]}
+        backend = min(validos, key=validos.get)
 
-    # Extract Client and Pedido
+        cache[layout] = {"backend": backend, "medicoes": resultados}
+        try:
+            cache_file.parent.mkdir(exist_ok=True)
+            temporario = cache_file.with_suffix(".json.tmp")
+            temporario.write_text(json.dumps(cache, indent=4), encoding="utf-8")
+            os.replace(temporario, cache_file)
+        except OSError as e:
+            print(f"Não foi possível gravar {cache_file.name}: {e}")
+
+    print(f"Layout novo ({layout}): usando backend {backend}.")
+    return backend
 
+
+def extrair_cabecalho(header_lines, lines_by_page):
     client_name = None
     pedido = None
     pedido_values = set()
 
-    for line in lines:
+    for line in header_lines:
 
         # Cliente
         if m := re.search(r'Cliente:\s*(.+?)(?:\s*\(\d+\)|$)', line):
@@ -82,17 +321,20 @@ def main():
         if m := re.search(r'pedido\s*nº:\s*(\d+)\s*data:', line, re.IGNORECASE):
             pedido = m.group(1)
 
-        # Pedido implícito via tabela
-        elif re.search(pad_romaneio, line) or re.search(pad_pedido, line):
-            pedido_values.add(line.split()[0])
-
-    # Fallback
+    # Pedido implícito via tabela
     if not pedido:
+        for _, page_lines in lines_by_page:
+            for line in page_lines:
+                if re.search(pad_romaneio, line) or re.search(pad_pedido, line):
+                    pedido_values.add(line.split()[0])
+
         pedido = next(iter(pedido_values), "Unknown")
         print(f"Pedido não encontrado explicitamente, usando: {pedido}")
 
-    # Extract Table Data
+    return client_name, pedido
 
+
+def extrair_produtos(lines_by_page):
     data = []
 
     for page_num, page_lines in lines_by_page:
@@ -110,12 +352,54 @@ def main():
             qtd_float = float(qtd.replace(",", "."))
             data.append([produto, descricao.strip(), qtd_float])
 
-    ordem_prod = pd.DataFrame(data, columns=["Produto", "Descrição", "Qtd."])
+    return pd.DataFrame(data, columns=["Produto", "Descrição", "Qtd."])
 
-    # Expand into box rows
 
-    print("Gerando linhas por caixa...\n")
+def benchmark_extracao(input_file, repeticoes=3):
+    """Compara o tempo dos modos "completo" e "recorte" no mesmo PDF."""
+    resultados = {}
+
+    for modo in ("completo", "recorte"):
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            header_lines, lines_by_page = ler_pdf(input_file, modo)
+            ordem_prod = extrair_produtos(lines_by_page)
+            tempos.append(time.perf_counter() - inicio)
+        resultados[modo] = (min(tempos), ordem_prod, extrair_cabecalho(header_lines, lines_by_page))
+
+    completo, recorte = resultados["completo"], resultados["recorte"]
+    print(f"Benchmark de extração: {Path(input_file).name} ({repeticoes} repetições)")
+    print(f"   completo: {completo[0]:.3f}s ({len(completo[1])} produtos)")
+    print(f"   recorte:  {recorte[0]:.3f}s ({len(recorte[1])} produtos)")
+    print(f"   ganho:    {completo[0] / recorte[0]:.1f}x")
+    if not completo[1].equals(recorte[1]) or completo[2] != recorte[2]:
+        print("   ATENÇÃO: os modos extraíram dados diferentes!")
+
+    return {modo: r[0] for modo, r in resultados.items()}
+
+
+def carregar_capacidades(base_file):
+    """Lê base_quantities.xlsx e retorna o mapa Produto → Qtd.Embalagem."""
+    base_file = Path(base_file)
+    if not base_file.exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {base_file.name}")
+
+    try:
+        base_df = pd.read_excel(base_file, dtype={"Produto": str})
+    except Exception as e:
+        raise ValueError(f"Erro ao ler {base_file.name}: {e}")
+
+    required_cols = ["Produto", "Qtd.Embalagem"]
+    missing_cols = [c for c in required_cols if c not in base_df.columns]
+    if missing_cols:
+        raise ValueError(f"Colunas faltando em base_quantities.xlsx: {missing_cols}")
+
+    base_df["Produto"] = base_df["Produto"].str.zfill(8).str.strip()
+    return base_df.set_index("Produto")["Qtd.Embalagem"].to_dict()
 
+
+def gerar_pacotes(ordem_prod, capacidade_por_produto, client_name, pedido):
     pacotes = []
 
     for _, row in ordem_prod.iterrows():
@@ -142,15 +426,153 @@ def main():
                 "Qtd. na Caixa": qtd_caixa,
             })
 
-    df_final = pd.DataFrame(pacotes)
+    return pd.DataFrame(pacotes)
 
-    print(f"Concluído: {len(df_final)} caixas geradas.\n")
 
-    # Save excel output
+# Specification parsing
+
+COLUNAS_ESPECIFICACAO = ["Bitola", "Abertura", "Comp", "Mod"]
+
+# Cache LRU compartilhado entre pedidos (e entre as threads do serviço HTTP)
+MAX_ESPECIFICACOES = 50_000
+_especificacoes = OrderedDict()
+_especificacoes_lock = threading.Lock()
+
+
+def extrair_especificacoes(descricoes):
+    """
+    Extrai Bitola/Abertura/Comp/Mod de uma coluna de descrições.
+
+    Cada descrição distinta passa uma única vez por um str.extract vetorizado.
+    Os resultados ficam num cache LRU de até MAX_ESPECIFICACOES descrições
+    para os próximos pedidos. Retorna um DataFrame com as colunas de
+    COLUNAS_ESPECIFICACAO, alinhado ao índice da entrada.
+    """
+    descricoes = descricoes.astype("string").str.strip()
+    unicas = descricoes.dropna().drop_duplicates()
+
+    with _especificacoes_lock:
+        conhecidas = {}
+        for d in unicas:
+            if d in _especificacoes:
+                _especificacoes.move_to_end(d)
+                conhecidas[d] = _especificacoes[d]
+
+    novas = unicas[~unicas.isin(conhecidas)]
+    if not novas.empty:
+        specs = novas.str.extract(pad_descricao)
+        specs.columns = COLUNAS_ESPECIFICACAO
+        extraidas = dict(zip(novas, specs.itertuples(index=False, name=None)))
+        conhecidas.update(extraidas)
+
+        with _especificacoes_lock:
+            _especificacoes.update(extraidas)
+            while len(_especificacoes) > MAX_ESPECIFICACOES:
+                _especificacoes.popitem(last=False)
+
+    vazio = (None,) * len(COLUNAS_ESPECIFICACAO)
+    linhas = [vazio if pd.isna(d) else conhecidas[d] for d in descricoes]
+    specs = pd.DataFrame(linhas, columns=COLUNAS_ESPECIFICACAO, index=descricoes.index)
+    return specs.astype("string")
+
+
+def adicionar_especificacoes(df_final):
+    """
+    Acrescenta as colunas de especificação à planilha de caixas.
 
+    Retorna (df_com_especificacoes, descricoes_nao_reconhecidas).
+    """
+    if df_final.empty:
+        return df_final, []
+
+    specs = extrair_especificacoes(df_final["Descrição"])
+    falhas = specs["Bitola"].isna() & df_final["Descrição"].notna()
+    nao_reconhecidas = df_final.loc[falhas, "Descrição"].drop_duplicates().tolist()
+    return pd.concat([df_final, specs], axis=1), nao_reconhecidas
+
+
+def salvar_relatorio_descricoes(nao_reconhecidas, pedido):
+    """Grava, em um único arquivo, as descrições sem especificação reconhecida."""
+    relatorio = Path(f"Descricoes nao reconhecidas Pedido {pedido}.txt")
+    linhas = [str(d) for d in nao_reconhecidas]
+    relatorio.write_text("\n".join(linhas) + "\n", encoding="utf-8")
+    return relatorio
+
+
+# Dry run
+
+AMOSTRA_ESTIMATIVA = 20
+DEFAULT_PPM = 60  # páginas por minuto assumidas quando não há vazão medida
+
+
+def estimar_trabalho(df_final, ppm=None, impressoras_file=None, amostra=AMOSTRA_ESTIMATIVA):
+    """
+    Projeta o custo de um trabalho de etiquetas sem renderizá-lo inteiro.
+
+    Uma amostra de etiquetas espalhadas pelo trabalho é desenhada em memória
+    para medir bytes e segundos por página. A vazão de impressão vem de ppm,
+    ou da soma das vazões medidas em impressoras_file (spool_impressao), ou
+    de DEFAULT_PPM.
+
+    Returns:
+        dict: paginas, bytes, render_s, impressao_s e ppm.
+    """
+    import io
+    from reportlab.lib.pagesizes import landscape
+    from reportlab.pdfgen import canvas
+    from tags_print_from_excel import DEFAULT_CONFIG, draw_box_label
+
+    labels = df_final.to_dict(orient="records")
+    paginas = len(labels)
+    if not paginas:
+        return {"paginas": 0, "bytes": 0, "render_s": 0.0, "impressao_s": 0.0, "ppm": ppm or DEFAULT_PPM}
+
+    passo = max(paginas // amostra, 1)
+    sample = labels[::passo][:amostra]
+    pagesize = landscape((DEFAULT_CONFIG["page_width"], DEFAULT_CONFIG["page_height"]))
+
+    def renderizar(etiquetas):
+        buffer = io.BytesIO()
+        inicio = time.perf_counter()
+        c = canvas.Canvas(buffer, pagesize=pagesize)
+        for label in etiquetas:
+            draw_box_label(c, label, DEFAULT_CONFIG)
+        c.save()
+        return len(buffer.getvalue()), time.perf_counter() - inicio
+
+    # A diferença entre a amostra e uma página só separa o custo fixo do PDF
+    bytes_um, _ = renderizar(sample[:1])
+    bytes_amostra, tempo_amostra = renderizar(sample)
+    bytes_pagina = (bytes_amostra - bytes_um) / (len(sample) - 1) if len(sample) > 1 else bytes_um
+    fixo = max(bytes_um - bytes_pagina, 0)
+
+    if ppm is None and impressoras_file and Path(impressoras_file).exists():
+        from spool_impressao import carregar_impressoras
+        ppm = sum(i.vazao for i in carregar_impressoras(impressoras_file)) * 60
+    ppm = ppm or DEFAULT_PPM
+
+    return {
+        "paginas": paginas,
+        "bytes": int(fixo + bytes_pagina * paginas),
+        "render_s": tempo_amostra / len(sample) * paginas,
+        "impressao_s": paginas / ppm * 60,
+        "ppm": ppm,
+    }
+
+
+def _duracao(segundos):
+    minutos, segundos = divmod(round(segundos), 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas}h{minutos:02d}min" if horas else f"{minutos}min{segundos:02d}s"
+
+
+def nome_planilha(pedido):
     timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-    output_file = Path(f"Etiquetas Pedido {pedido} Data {timestamp}.xlsx")
+    return f"Etiquetas Pedido {pedido} Data {timestamp}.xlsx"
 
+
+def salvar_excel(df_final, output_file):
+    """Grava a planilha de pacotes formatada em um caminho ou buffer."""
     with pd.ExcelWriter(output_file, engine="openpyxl") as writer:
         df_final.to_excel(writer, index=False, sheet_name="Pacotes")
 
@@ -167,6 +589,104 @@ def main():
             cell.font = Font(bold=True)
             cell.alignment = Alignment(horizontal="center")
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera a planilha de etiquetas por caixa a partir do PDF do pedido.")
+    parser.add_argument("--modo", choices=["recorte", "completo"], default="completo",
+                        help="completo: página inteira (padrão); recorte: ignora o que fica acima da tabela")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="compara os modos de extração e sai sem gerar a planilha")
+    parser.add_argument("--backend", choices=[*BACKENDS, "auto"], default="pdfplumber",
+                        help="biblioteca de extração; auto escolhe a mais rápida validada para o layout")
+    parser.add_argument("--comparar-backends", action="store_true",
+                        help="confere e mede todos os backends nos PDFs da pasta e sai")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="calcula caixas e estima páginas, tamanho e tempos sem gerar arquivos")
+    parser.add_argument("--ppm", type=float,
+                        help="páginas por minuto para a estimativa (padrão: vazão medida em impressoras.json)")
+    args = parser.parse_args()
+
+    # Files aquisition
+    app_dir = get_app_dir()
+
+    pdf_files = list(app_dir.glob("*.pdf"))
+
+    if not pdf_files:
+        raise FileNotFoundError("Nenhum arquivo PDF encontrado na pasta do aplicativo.")
+
+    input_file = pdf_files[0]
+    romaneio = input_file.stem
+
+    if args.benchmark:
+        benchmark_extracao(input_file)
+        return
+
+    if args.comparar_backends:
+        for pdf_file in pdf_files:
+            print(pdf_file.name)
+            for nome, r in comparar_backends(pdf_file, args.modo).items():
+                status = "idêntico" if r["identico"] else "DIFERENTE"
+                print(f"   {nome:12} {r['tempo']:.3f}s  {status}")
+        return
+
+    BASE_DIR = app_dir / "BASE"
+    BASE_FILE = BASE_DIR / "base_quantities.xlsx"
+
+    # Load base quantities
+
+    capacidade_por_produto = carregar_capacidades(BASE_FILE)
+
+    print(f"Base carregada: {len(capacidade_por_produto)} produtos definidos.")
+    print("Produtos sem capacidade definida usarão 10 peças por caixa.\n")
+
+    # Read PDF
+
+    header_lines, lines_by_page = ler_pdf(input_file, args.modo, args.backend)
+
+    # Extract Client and Pedido
+
+    client_name, pedido = extrair_cabecalho(header_lines, lines_by_page)
+
+    # Extract Table Data
+
+    ordem_prod = extrair_produtos(lines_by_page)
+
+    # Expand into box rows
+
+    print("Gerando linhas por caixa...\n")
+
+    df_final = gerar_pacotes(ordem_prod, capacidade_por_produto, client_name, pedido)
+
+    print(f"Concluído: {len(df_final)} caixas geradas.\n")
+
+    if args.dry_run:
+        estimativa = estimar_trabalho(df_final, args.ppm, app_dir / "impressoras.json")
+        print(f"Estimativa (sem gerar arquivos) — Pedido {pedido}")
+        print(f"   páginas:   {estimativa['paginas']}")
+        print(f"   PDF:       {estimativa['bytes'] / 1024 ** 2:.1f} MB")
+        print(f"   render:    {_duracao(estimativa['render_s'])}")
+        print(f"   impressão: {_duracao(estimativa['impressao_s'])} a {estimativa['ppm']:.0f} páginas/min")
+        return
+
+    # Parse specifications
+
+    df_final, nao_reconhecidas = adicionar_especificacoes(df_final)
+    if nao_reconhecidas:
+        relatorio = salvar_relatorio_descricoes(nao_reconhecidas, pedido)
+        print(f"{len(nao_reconhecidas)} descrições sem especificação reconhecida: {relatorio.name}\n")
+
+    # Save excel output
+
+    output_file = Path(nome_planilha(pedido))
+    salvar_excel(df_final, output_file)
+
+    # Index the job (row 1 is the header)
+
+    try:
+        registrar_job("planilha", output_file, df_final.to_dict(orient="records"), pedido, client_name, primeira_pagina=2)
+    except Exception as e:
+        print(f"Aviso: não foi possível registrar no índice de trabalhos: {e}")
+
     print("PRONTO!")
     print(f"Arquivo gerado: {output_file.name}")
     print(f"Local: {output_file.resolve()}\n")
@@ -42,7 +42,7 @@ output_dir = script_dir / "OPs"
 
 # Parse description
 def parse_description(desc):
-    pattern = r'(M\s?\d+|\d+/\d+"?)\s*[xX]\s*(\d+)\s*[xX]\s*(\d+)\s*([A-Z]{1,2})'
+    pattern = r'(M\s?\d++|(?<!\d)\d++/\d++"?)\s*+[xX]\s*+(\d++)\s*+[xX]\s*+(\d++)\s*+([A-Z]{1,2})'
     try:
         if pd.isna(desc) or not isinstance(desc, str) or not desc.strip():
             print(f"Invalid description: '{desc}'")
@@ -61,9 +61,9 @@ def parse_description(desc):
         print(f"Error parsing description '{desc}': {e}")
         return pd.Series([None, None, None, None])
 
-# Define regex patterns
-pad_romaneio = r'^\d+\s+\d+\s+(\d+)\s+(.*?)\s+(\d{1,3}(?:,\d{1,4})?)$'
-pad_orcamento = r'^\d+\s+(\d+)\s+(GRAMPO.*?)\s+PC\s+(\d{1,3}(?:,\d{1,4})?)(?:\s+.*)?$'
+# Define regex patterns (possessive/lookbehind forms keep matching linear on long lines)
+pad_romaneio = r'^\d++\s++\d++\s++(\d++)\s(.*)\s(\d{1,3}(?:,\d{1,4})?)$'
+pad_orcamento = r'^\d++\s++(\d++)\s++(GRAMPO.*?)(?<=\S)\s++PC\s++(\d{1,3}(?:,\d{1,4})?)(?:\s.*)?$'
 
 # Extraindo o PDF
 with pdfplumber.open(input_file) as pdf:
@@ -6,8 +6,13 @@ from pathlib import Path
 import textwrap
 from datetime import datetime
 import logging
+import argparse
 import glob
+import itertools
 import os
+from indice_jobs import RegistroJob
+from leitura_excel import iter_linhas_excel, contar_linhas, texto, inteiro
+from pdf_partes import DEFAULT_PAGINAS_POR_PARTE, renderizar_em_partes
 
 # Configure logging
 logging.basicConfig(filename='labels.log', level=logging.DEBUG, format='%(message)s')
@@ -36,23 +41,47 @@ def draw_wrapped_text(canvas, text, x, y, prefix, width, font, font_size, max_li
         canvas.drawString(x, y - i * 5 * mm, f"{prefix}: {line}" if i == 0 else line)
     return y - len(wrapped) * 5 * mm
 
-def generate_shipping_labels_from_excel(excel_file, output_file=None, config=None):
-    """
-    Generate shipping labels from an Excel file as a PDF.
+REQUIRED_COLS = ["Cliente", "Descrição", "Produto", "Caixa", "Qtd. na Caixa"]
+CONVERTERS = {"Produto": texto, "Pedido": texto, "Qtd. na Caixa": inteiro}
+NON_EMPTY_COLS = ["Produto", "Caixa", "Qtd. na Caixa"]
+HEADER_FONT = ("Helvetica-Bold", 18)
 
-    Args:
-        excel_file (str): Path to the Excel file with label data.
-        output_file (str, optional): Output PDF file path. Defaults to timestamped filename.
-        config (dict, optional): Configuration for page size, fonts, and layout.
+def draw_box_label(c, label, config):
+    """Draw one box label on the current page of the canvas."""
+    c.saveState()
 
-    Raises:
-        FileNotFoundError: If the Excel file is not found.
-        ValueError: If required columns are missing or data is invalid.
-    """
-    # Use default config if none provided
-    config = config or DEFAULT_CONFIG
+    c.setFont(*HEADER_FONT)
+    y = config["start_y"]
+    text_width = c.stringWidth(company_name, *HEADER_FONT)
+    x_centered = (config["page_width"] - text_width) / 2
+    c.drawString(x_centered, y, company_name)
 
-    # Load Excel file
+    line_y = y - 3 * mm
+    c.setLineWidth(1.5)
+    c.line(5 * mm, line_y, config["page_width"] - 5 * mm, line_y)
+    y = line_y - config["large_spacing"]
+
+    y = draw_wrapped_text(c, label["Cliente"], 10 * mm, y, "Cliente", config["text_widths"]["Cliente"], *config["font_title"])
+    y = draw_wrapped_text(c, label["Descrição"], 10 * mm, y - config["line_spacing"], "Descrição", config["text_widths"]["Descrição"], *config["font_body"])
+
+    y -= config["line_spacing"]
+    c.setFont(*config["font_body"])
+    c.drawString(10 * mm, y, f"Produto: {str(label['Produto']).zfill(8).upper()}")
+
+    y -= config["large_spacing"]
+    c.drawString(10 * mm, y, f"Pedido: {label['Pedido']}")
+
+    y -= config["large_spacing"]
+    c.drawString(10 * mm, y, f"Pacote: {label['Caixa']}")
+
+    y -= config["large_spacing"]
+    c.drawString(10 * mm, y, f"Qtd: {label['Qtd. na Caixa']}")
+
+    c.restoreState()
+    c.showPage()
+
+def read_labels_dataframe(excel_file):
+    """Load every label row at once with pandas (non-streaming mode)."""
     try:
         tags_dataframe = pd.read_excel(excel_file, dtype={"Produto": str, "Pedido": str, "Qtd. na Caixa": int})
     except FileNotFoundError:
@@ -64,73 +93,146 @@ def generate_shipping_labels_from_excel(excel_file, output_file=None, config=Non
         raise ValueError("Arquivo excel está vazio.")
 
     # Check required columns
-    required_cols = ["Cliente", "Descrição", "Produto", "Caixa", "Qtd. na Caixa"]
-    for col in required_cols:
+    for col in REQUIRED_COLS:
         if col not in tags_dataframe.columns:
             raise ValueError(f"Colunas faltando no arquivo: {col}")
         if tags_dataframe[col].isna().all():
             raise ValueError(f"Coluna obrigatória '{col}' está completamente vazia.")
+    for col in NON_EMPTY_COLS:
+        if tags_dataframe[col].isna().any():
+            raise ValueError(f"Coluna {col} está vazia.")
 
-    # Log dataset size
-    logging.debug(f"Processing {len(tags_dataframe)} labels from {excel_file}")
-    if len(tags_dataframe) > 1000:
-        logging.warning(f"Large dataset ({len(tags_dataframe)} rows) may increase processing time.")
-
-    # Convert dataframe to list of dicts
-    labels = tags_dataframe.to_dict(orient="records")
+    return len(tags_dataframe), iter(tags_dataframe.to_dict(orient="records"))
 
-    # Default output filename
-    output_path = Path(output_file if output_file else f"etiquetas_pedido_{tags_dataframe["Pedido"].iloc[0]}_{datetime.now().strftime('%y%m%d_%H%M')}.pdf")
+def read_labels_streaming(excel_file):
+    """Iterate label rows straight from the xlsx in read-only mode."""
+    return contar_linhas(excel_file), iter_linhas_excel(excel_file, REQUIRED_COLS, CONVERTERS, nao_vazias=NON_EMPTY_COLS)
 
-    # Setup PDF
-    try:
-        c = canvas.Canvas(str(output_path), pagesize=landscape((config["page_width"], config["page_height"])))
-        company_name = "CIMEPARTS"
-        header_font = ("Helvetica-Bold", 18)
+def find_partial_output(pedido):
+    """Most recent unfinished part-file job for the order, if any."""
+    folders = sorted(Path(".").glob(f"etiquetas_pedido_{pedido}_*.partes"), key=os.path.getmtime)
+    return folders[-1].with_name(folders[-1].name[:-len(".partes")] + ".pdf") if folders else None
 
-        for label in labels:
-            c.saveState()
+def generate_shipping_labels_from_excel(excel_file, output_file=None, config=None, streaming=True,
+                                        pages_per_part=None, resume=False):
+    """
+    Generate shipping labels from an Excel file as a PDF.
 
-            c.setFont(*header_font)
-            y = config["start_y"]
-            text_width = c.stringWidth(company_name, *header_font)
-            x_centered = (config["page_width"] - text_width) / 2
-            c.drawString(x_centered, y, company_name)
+    Args:
+        excel_file (str): Path to the Excel file (or binary buffer) with label data.
+        output_file (str, optional): Output PDF file path or writable binary buffer.
+            Defaults to timestamped filename.
+        config (dict, optional): Configuration for page size, fonts, and layout.
+        streaming (bool, optional): Read rows one at a time with openpyxl in
+            read-only mode and draw each one as soon as it is validated. When
+            False, the whole sheet is loaded with pandas first.
+        pages_per_part (int, optional): Save every N labels to a part file on
+            disk as soon as they are drawn, joining the parts at the end, so
+            memory stays flat on very large jobs. Ignored for buffer output.
+        resume (bool, optional): With pages_per_part, reuse the parts already
+            saved by an interrupted run and continue from the next label.
 
-            line_y = y - 3 * mm
-            c.setLineWidth(1.5)
-            c.line(5 * mm, line_y, config["page_width"] - 5 * mm, line_y)
-            y = line_y - config["large_spacing"]
+    Raises:
+        FileNotFoundError: If the Excel file is not found.
+        ValueError: If required columns are missing or data is invalid.
+    """
+    # Use default config if none provided
+    config = config or DEFAULT_CONFIG
 
-            y = draw_wrapped_text(c, label["Cliente"], 10 * mm, y, "Cliente", config["text_widths"]["Cliente"], *config["font_title"])
-            y = draw_wrapped_text(c, label["Descrição"], 10 * mm, y - config["line_spacing"], "Descrição", config["text_widths"]["Descrição"], *config["font_body"])
+    # Load Excel file
+    if streaming:
+        total_rows, labels = read_labels_streaming(excel_file)
+    else:
+        total_rows, labels = read_labels_dataframe(excel_file)
 
-            y -= config["line_spacing"]
-            c.setFont(*config["font_body"])
-            c.drawString(10 * mm, y, f"Produto: {str(label['Produto']).zfill(8).upper()}")
+    # The first row is needed up front for the default filename
+    first_label = next(labels)
 
-            y -= config["large_spacing"]
-            c.drawString(10 * mm, y, f"Pedido: {label['Pedido']}")
+    # Log dataset size
+    logging.debug(f"Processing {total_rows} labels from {excel_file}")
+    if total_rows and total_rows > 1000:
+        logging.warning(f"Large dataset ({total_rows} rows) may increase processing time.")
+
+    # Default output filename (a writable buffer is also accepted)
+    if output_file is None and resume:
+        output_file = find_partial_output(first_label["Pedido"])
+    if output_file is None:
+        output_file = f"etiquetas_pedido_{first_label['Pedido']}_{datetime.now().strftime('%y%m%d_%H%M')}.pdf"
+    is_stream = hasattr(output_file, "write")
+    output_path = output_file if is_stream else Path(output_file)
+    pagesize = landscape((config["page_width"], config["page_height"]))
+
+    # Boxes go to the job index in chunks as they are drawn; the job only shows
+    # up in searches once the PDF is complete. Buffer output (the label service)
+    # is indexed under a memoria:// name, since there is no file to point to
+    index_file = f"memoria://etiquetas_pedido_{first_label['Pedido']}.pdf" if is_stream else output_path
+    index_name = index_file if is_stream else output_path.name
+    registro = None
+    try:
+        registro = RegistroJob("etiquetas", index_file, first_label.get("Pedido"), first_label.get("Cliente"),
+                               em_disco=not is_stream)
+    except Exception as e:
+        logging.warning(f"Could not index job {index_name}: {e}")
+
+    def indexed(rows):
+        nonlocal registro
+        for label in rows:
+            if registro is not None:
+                try:
+                    registro.adicionar(label)
+                except Exception as e:
+                    logging.warning(f"Could not index job {index_name}: {e}")
+                    registro.cancelar()
+                    registro = None
+            yield label
+
+    rows = indexed(itertools.chain([first_label], labels))
 
-            y -= config["large_spacing"]
-            c.drawString(10 * mm, y, f"Pacote: {label['Caixa']}")
+    # Setup PDF
+    try:
+        if pages_per_part and not is_stream:
+            count = renderizar_em_partes(rows, lambda c, label: draw_box_label(c, label, config),
+                                         output_path, pagesize, pages_per_part, resume)
+        else:
+            c = canvas.Canvas(output_path if is_stream else str(output_path), pagesize=pagesize)
 
-            y -= config["large_spacing"]
-            c.drawString(10 * mm, y, f"Qtd: {label['Qtd. na Caixa']}")
+            count = 0
+            for label in rows:
+                draw_box_label(c, label, config)
+                count += 1
 
-            c.restoreState()
-            c.showPage()
+            c.save()
 
-        c.save()
+    except ValueError:
+        if registro is not None:
+            registro.cancelar()
+        raise
 
     except Exception as e:
+        if registro is not None:
+            registro.cancelar()
         raise RuntimeError(f"Erro ao gerar PDF: {e}")
 
     else:
-        print(f"PDF gerado com sucesso: {output_path.resolve()}")
-        logging.debug(f"Generated PDF: {output_path.resolve()}")
+        if is_stream:
+            logging.debug(f"Generated PDF in memory ({count} labels)")
+        else:
+            print(f"PDF gerado com sucesso: {output_path.resolve()}")
+            logging.debug(f"Generated PDF: {output_path.resolve()}")
+        if registro is not None:
+            try:
+                registro.concluir()
+            except Exception as e:
+                logging.warning(f"Could not index job {index_name}: {e}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate box labels from the Etiquetas Pedido sheet.")
+    parser.add_argument("--parts", type=int, metavar="N",
+                        help="save every N labels to disk as they are drawn (for very large jobs)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted --parts run from the last saved label")
+    args = parser.parse_args()
+
     # Pattern: files starting with "Etiquetas Pedido" and ending with .xlsx
     files = glob.glob("Etiquetas Pedido*.xlsx")
 
@@ -142,4 +244,5 @@ if __name__ == "__main__":
     else:
         xlsx_file = files[0]  # First match
         print(f"Using Excel file: {xlsx_file}")
-        generate_shipping_labels_from_excel(xlsx_file)
\ No newline at end of file
+        parts = args.parts or (DEFAULT_PAGINAS_POR_PARTE if args.resume else None)
+        generate_shipping_labels_from_excel(xlsx_file, pages_per_part=parts, resume=args.resume)
\ No newline at end of file
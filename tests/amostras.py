@@ -0,0 +1,69 @@
+"""Geradores de PDFs e planilhas de exemplo para os testes."""
+import random
+
+import pandas as pd
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+CLIENTE = "METALURGICA EXEMPLO LTDA"
+PEDIDO = "98765"
+
+
+def linha_romaneio(i, rnd):
+    produto = f"{rnd.randint(1, 99999999):08d}"
+    descricao = f"GRAMPO U M{rnd.choice([8, 10, 12])} X {rnd.randint(30, 90)} X {rnd.randint(50, 200)} ZB"
+    qtd = f"{rnd.randint(1, 999)},{rnd.randint(0, 99):02d}" if i % 3 else str(rnd.randint(1, 999))
+    return f"{PEDIDO} {i} {produto} {descricao} {qtd}"
+
+
+def gerar_pedido_pdf(path, linhas_por_pagina, seed=1):
+    """
+    Romaneio com cabeçalho na primeira página e uma tabela por página.
+
+    linhas_por_pagina define quantas linhas de produto cada página tem, para
+    montar documentos com páginas de tamanhos diferentes.
+    """
+    rnd = random.Random(seed)
+    c = canvas.Canvas(str(path), pagesize=A4)
+    _, altura = A4
+    item = 0
+
+    for pagina, linhas in enumerate(linhas_por_pagina, 1):
+        c.setFont("Helvetica", 9)
+        c.drawString(30, altura - 40, "CIMEPARTS IND. E COM. LTDA   Relatório de Romaneio")
+        if pagina == 1:
+            c.drawString(30, altura - 55, f"Cliente: {CLIENTE} (1234)")
+            c.drawString(30, altura - 70, f"Pedido nº: {PEDIDO} Data: 01/10/2025")
+        c.drawString(30, altura - 95, "Ped Item Produto Descrição Qtd.")
+
+        y = altura - 115
+        for _ in range(linhas):
+            item += 1
+            c.drawString(30, y, linha_romaneio(item, rnd))
+            y -= 12
+        if pagina == len(linhas_por_pagina):
+            c.drawString(30, y - 20, "Total de itens: 123 456 789 0,00")
+        c.drawString(30, 30, f"Página {pagina}")
+        c.showPage()
+
+    c.save()
+    return item
+
+
+def gerar_planilha_caixas(path, caixas, sobrescrever=None):
+    """Planilha de caixas no formato do tags_clean2, com `caixas` linhas."""
+    linhas = [
+        {
+            "Cliente": CLIENTE,
+            "Pedido": PEDIDO,
+            "Produto": f"{i:08d}",
+            "Descrição": f"GRAMPO U M10 X {i % 90} X 100 ZB",
+            "Caixa": f"{i}/{caixas}",
+            "Qtd. na Caixa": 10,
+        }
+        for i in range(1, caixas + 1)
+    ]
+    for linha, valores in (sobrescrever or {}).items():
+        linhas[linha].update(valores)
+    pd.DataFrame(linhas).to_excel(path, index=False)
+    return path
@@ -0,0 +1,21 @@
+import logging
+import sys
+from pathlib import Path
+
+# Os módulos configuram logging para labels.log ao serem importados; com um
+# handler já instalado esse basicConfig não tem efeito e nada é gravado no repo
+logging.basicConfig(handlers=[logging.NullHandler()])
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest  # noqa: E402
+
+import indice_jobs  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def indice_temporario(tmp_path, monkeypatch):
+    """Grava o índice de trabalhos no diretório do teste, nunca em BASE/."""
+    db_file = tmp_path / "jobs.sqlite"
+    monkeypatch.setattr(indice_jobs, "default_db_file", lambda: db_file)
+    return db_file
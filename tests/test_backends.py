@@ -0,0 +1,82 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import tags_clean2
+from amostras import CLIENTE, PEDIDO, gerar_pedido_pdf
+
+AMOSTRAS = {
+    "uma_pagina": [30],
+    "paginas_desiguais": [20, 20, 55, 55],
+    "pagina_sem_produtos": [40, 0, 40],
+}
+
+
+@pytest.fixture(params=AMOSTRAS.values(), ids=AMOSTRAS)
+def amostra(request, tmp_path):
+    pdf = tmp_path / "pedido.pdf"
+    total = gerar_pedido_pdf(pdf, request.param, seed=len(request.param))
+    return pdf, total
+
+
+@pytest.mark.parametrize("backend", tags_clean2.BACKENDS)
+def test_backend_extrai_o_mesmo_que_a_referencia(amostra, backend):
+    pdf, total = amostra
+    referencia = tags_clean2.ler_pdf(pdf, "completo", "pdfplumber")
+
+    header_lines, lines_by_page = tags_clean2.ler_pdf(pdf, "completo", backend)
+
+    produtos = tags_clean2.extrair_produtos(lines_by_page)
+    assert len(produtos) == total
+    assert produtos.equals(tags_clean2.extrair_produtos(referencia[1]))
+    assert tags_clean2.extrair_cabecalho(header_lines, lines_by_page) == (CLIENTE, PEDIDO)
+
+
+@pytest.mark.parametrize("modo", ["completo", "recorte"])
+def test_comparar_backends_aceita_todos_os_conformes(amostra, modo):
+    pdf, _ = amostra
+
+    resultados = tags_clean2.comparar_backends(pdf, modo)
+
+    assert set(resultados) == set(tags_clean2.BACKENDS)
+    assert all(r["identico"] for r in resultados.values())
+
+
+def test_escolher_backend_grava_a_escolha_por_layout(amostra, tmp_path):
+    pdf, _ = amostra
+    cache_file = tmp_path / "backends.json"
+
+    backend = tags_clean2.escolher_backend(pdf, cache_file)
+
+    cache = json.loads(cache_file.read_text(encoding="utf-8"))
+    (layout, escolha), = cache.items()
+    assert escolha["backend"] == backend
+    assert escolha["medicoes"][backend]["identico"]
+    assert tags_clean2.escolher_backend(pdf, cache_file) == backend
+
+
+def test_pdfium_em_varias_threads(tmp_path):
+    # Sem o lock do tags_clean2 o PDFium derruba o processo (segfault)
+    pdf = tmp_path / "pedido.pdf"
+    total = gerar_pedido_pdf(pdf, [30, 30])
+    dados = pdf.read_bytes()
+
+    def ler(_):
+        return len(tags_clean2.extrair_produtos(tags_clean2.ler_pdf(io.BytesIO(dados), backend="pdfium")[1]))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert set(executor.map(ler, range(200))) == {total}
+
+
+def test_escolher_backend_em_varias_threads(amostra, tmp_path):
+    pdf, _ = amostra
+    cache_file = tmp_path / "backends.json"
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        escolhas = set(executor.map(lambda _: tags_clean2.escolher_backend(pdf, cache_file), range(16)))
+
+    cache = json.loads(cache_file.read_text(encoding="utf-8"))
+    (layout, escolha), = cache.items()
+    assert escolhas == {escolha["backend"]}
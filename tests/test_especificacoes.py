@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+import tags_clean2
+
+
+@pytest.fixture(autouse=True)
+def cache_vazio(monkeypatch):
+    monkeypatch.setattr(tags_clean2, "_especificacoes", type(tags_clean2._especificacoes)())
+
+
+def descricoes(n, inicio=0):
+    return pd.Series([f"GRAMPO U M{10 + i % 3} X {i} X 100 ZB" for i in range(inicio, inicio + n)])
+
+
+def test_extrai_e_reporta_nao_reconhecidas():
+    df = pd.DataFrame({"Descrição": ['GRAMPO U 1/2" X 40 X 100 ZP', "PARAFUSO SEXTAVADO", None]})
+
+    final, nao_reconhecidas = tags_clean2.adicionar_especificacoes(df)
+
+    assert final.loc[0, tags_clean2.COLUNAS_ESPECIFICACAO].tolist() == ['1/2"', "40", "100", "ZP"]
+    assert final.loc[1, tags_clean2.COLUNAS_ESPECIFICACAO].isna().all()
+    assert nao_reconhecidas == ["PARAFUSO SEXTAVADO"]
+
+
+def test_cache_e_limitado(monkeypatch):
+    monkeypatch.setattr(tags_clean2, "MAX_ESPECIFICACOES", 50)
+
+    for lote in range(5):
+        tags_clean2.extrair_especificacoes(descricoes(40, lote * 40))
+
+    assert len(tags_clean2._especificacoes) == 50
+    assert "GRAMPO U M11 X 199 X 100 ZB" in tags_clean2._especificacoes
+
+
+def test_pedido_maior_que_o_cache_continua_correto(monkeypatch):
+    monkeypatch.setattr(tags_clean2, "MAX_ESPECIFICACOES", 10)
+
+    specs = tags_clean2.extrair_especificacoes(descricoes(100))
+
+    assert specs["Abertura"].tolist() == [str(i) for i in range(100)]
+
+
+def test_threads_concorrentes(monkeypatch):
+    monkeypatch.setattr(tags_clean2, "MAX_ESPECIFICACOES", 100)
+
+    def job(i):
+        specs = tags_clean2.extrair_especificacoes(descricoes(60, i * 7))
+        return specs["Abertura"].tolist() == [str(n) for n in range(i * 7, i * 7 + 60)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(executor.map(job, range(40)))
+    assert len(tags_clean2._especificacoes) <= 100
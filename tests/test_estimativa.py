@@ -0,0 +1,94 @@
+import json
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+import tags_clean2
+from amostras import PEDIDO, gerar_pedido_pdf
+from indice_jobs import buscar_caixas
+from spool_impressao import renderizar_lote
+
+
+def caixas(n):
+    return pd.DataFrame([
+        {"Cliente": "METALURGICA EXEMPLO LTDA", "Pedido": PEDIDO, "Produto": f"{i:08d}",
+         "Descrição": f"GRAMPO U M{8 + i % 3 * 2} X {30 + i % 60} X {50 + i % 150} ZB",
+         "Caixa": f"{i % 7 + 1}/7", "Qtd. na Caixa": 10 + i % 40}
+        for i in range(n)
+    ])
+
+
+def impressoras_json(path, vazoes):
+    path.write_text(json.dumps([
+        {"nome": f"zebra{n}", "tipo": "socket", "host": "10.0.0.1", "vazao": vazao} for n, vazao in enumerate(vazoes)
+    ]), encoding="utf-8")
+    return path
+
+
+def test_estimativa_confere_com_o_render_completo():
+    df = caixas(400)
+
+    estimativa = tags_clean2.estimar_trabalho(df)
+    inicio = time.perf_counter()
+    pdf = renderizar_lote(df.to_dict(orient="records"))
+    render_s = time.perf_counter() - inicio
+
+    assert estimativa["paginas"] == len(df)
+    assert estimativa["bytes"] == pytest.approx(len(pdf), rel=0.05)
+    # Tempo medido em uma máquina compartilhada: só a ordem de grandeza
+    assert render_s / 3 < estimativa["render_s"] < render_s * 3
+
+
+def test_trabalho_vazio():
+    estimativa = tags_clean2.estimar_trabalho(caixas(0))
+
+    assert (estimativa["paginas"], estimativa["bytes"], estimativa["ppm"]) == (0, 0, tags_clean2.DEFAULT_PPM)
+
+
+def test_ppm_explicito_vence_impressoras(tmp_path):
+    config = impressoras_json(tmp_path / "impressoras.json", [0.5, 1.5])
+
+    estimativa = tags_clean2.estimar_trabalho(caixas(30), ppm=90, impressoras_file=config)
+
+    assert estimativa["ppm"] == 90
+    assert estimativa["impressao_s"] == pytest.approx(30 / 90 * 60)
+
+
+def test_ppm_das_impressoras_e_a_soma_das_vazoes(tmp_path):
+    config = impressoras_json(tmp_path / "impressoras.json", [0.5, 1.5])
+
+    estimativa = tags_clean2.estimar_trabalho(caixas(30), impressoras_file=config)
+
+    assert estimativa["ppm"] == pytest.approx(120)
+    assert estimativa["impressao_s"] == pytest.approx(15)
+
+
+def test_ppm_padrao_sem_impressoras(tmp_path):
+    estimativa = tags_clean2.estimar_trabalho(caixas(30), impressoras_file=tmp_path / "impressoras.json")
+
+    assert estimativa["ppm"] == tags_clean2.DEFAULT_PPM
+
+
+def test_dry_run_nao_gera_planilha_nem_indexa(tmp_path, monkeypatch, capsys):
+    app_dir = tmp_path / "app"
+    (app_dir / "BASE").mkdir(parents=True)
+    total = gerar_pedido_pdf(app_dir / "pedido.pdf", [10, 5])
+    pd.DataFrame({"Produto": ["00000001"], "Qtd.Embalagem": [50]}).to_excel(
+        app_dir / "BASE" / "base_quantities.xlsx", index=False)
+    impressoras_json(app_dir / "impressoras.json", [2.0])
+    monkeypatch.setattr(tags_clean2, "get_app_dir", lambda: app_dir)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["tags_clean2.py", "--dry-run"])
+
+    tags_clean2.main()
+
+    saida = capsys.readouterr().out
+    caixas_geradas = int(saida.split("Concluído: ")[1].split()[0])
+    assert caixas_geradas >= total
+    assert f"páginas:   {caixas_geradas}" in saida
+    assert "a 120 páginas/min" in saida
+    assert list(tmp_path.rglob("Etiquetas*.xlsx")) == []
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["app"]
+    assert buscar_caixas() == []
@@ -0,0 +1,23 @@
+import pytest
+
+import tags_clean2
+from amostras import CLIENTE, PEDIDO, gerar_pedido_pdf
+
+
+@pytest.mark.parametrize("linhas_por_pagina", [
+    [20, 20, 55, 55],
+    [55, 55, 20, 55],
+    [30],
+    [40, 0, 40],
+])
+def test_recorte_extrai_os_mesmos_produtos_que_completo(tmp_path, linhas_por_pagina):
+    pdf = tmp_path / "pedido.pdf"
+    total = gerar_pedido_pdf(pdf, linhas_por_pagina)
+
+    completo = tags_clean2.ler_pdf(pdf, "completo")
+    recorte = tags_clean2.ler_pdf(pdf, "recorte")
+
+    produtos = tags_clean2.extrair_produtos(recorte[1])
+    assert len(produtos) == total
+    assert produtos.equals(tags_clean2.extrair_produtos(completo[1]))
+    assert tags_clean2.extrair_cabecalho(*recorte) == (CLIENTE, PEDIDO)
@@ -0,0 +1,126 @@
+import io
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+
+import pytest
+
+import indice_jobs
+from amostras import PEDIDO, gerar_planilha_caixas
+from indice_jobs import RegistroJob, buscar_caixas, registrar_job
+from tags_print_from_excel import generate_shipping_labels_from_excel
+
+
+def caixa(produto, n=1):
+    return {"Produto": produto, "Descrição": "GRAMPO", "Caixa": f"{n}/1", "Qtd. na Caixa": 10}
+
+
+def test_produto_sem_zeros_e_encontrado(tmp_path):
+    registrar_job("planilha", tmp_path / "caixas.xlsx", [caixa(12345), caixa("678")], "1", primeira_pagina=2)
+
+    assert [c["pagina"] for c in buscar_caixas(produto="12345")] == [2]
+    assert [c["produto"] for c in buscar_caixas(produto="00000678")] == ["00000678"]
+
+
+def test_registro_grava_em_blocos_e_so_aparece_ao_concluir(tmp_path):
+    registro = RegistroJob("etiquetas", tmp_path / "e.pdf", "1", bloco=10)
+    for i in range(25):
+        registro.adicionar(caixa(i))
+
+    assert len(registro._pendentes) == 5
+    assert registro.conn.execute("SELECT COUNT(*) FROM caixas").fetchone()[0] == 20
+    assert buscar_caixas(pedido="1") == []
+
+    registro.concluir()
+    caixas = buscar_caixas(pedido="1")
+    assert [c["pagina"] for c in caixas] == list(range(1, 26))
+
+
+@pytest.mark.parametrize("pages_per_part", [None, 7])
+def test_etiquetas_indexadas_por_pagina(tmp_path, pages_per_part):
+    planilha = gerar_planilha_caixas(tmp_path / "caixas.xlsx", 30)
+    saida = tmp_path / "etiquetas.pdf"
+
+    generate_shipping_labels_from_excel(planilha, saida, pages_per_part=pages_per_part)
+
+    caixas = buscar_caixas(pedido=PEDIDO, tipo="etiquetas")
+    assert [c["pagina"] for c in caixas] == list(range(1, 31))
+    assert caixas[4]["produto"] == "00000005"
+    assert caixas[0]["arquivo"] == str(saida.resolve())
+
+
+def test_falha_no_meio_nao_deixa_trabalho_no_indice(tmp_path, indice_temporario):
+    planilha = gerar_planilha_caixas(tmp_path / "caixas.xlsx", 30, {20: {"Descrição": "X" * 500}})
+
+    with pytest.raises(ValueError):
+        generate_shipping_labels_from_excel(planilha, tmp_path / "etiquetas.pdf")
+
+    with closing(indice_jobs.conectar(indice_temporario)) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM caixas").fetchone()[0] == 0
+
+
+def test_outra_estacao_grava_enquanto_um_trabalho_esta_aberto(tmp_path, monkeypatch):
+    # Sem transações curtas a segunda estação esperaria o fim da primeira
+    monkeypatch.setattr(indice_jobs, "ESPERA_BLOQUEIO", 0.2)
+    aberto = RegistroJob("etiquetas", tmp_path / "a.pdf", "1", bloco=10)
+    for i in range(25):
+        aberto.adicionar(caixa(i))
+
+    registrar_job("etiquetas", tmp_path / "b.pdf", [caixa(1), caixa(2)], "2")
+    assert [c["pedido"] for c in buscar_caixas()] == ["2", "2"]
+
+    aberto.adicionar(caixa(99))
+    aberto.concluir()
+    assert len(buscar_caixas(pedido="1")) == 26
+
+
+def test_cancelar_apaga_os_blocos_ja_gravados(tmp_path, indice_temporario):
+    registro = RegistroJob("etiquetas", tmp_path / "e.pdf", "1", bloco=10)
+    for i in range(25):
+        registro.adicionar(caixa(i))
+
+    registro.cancelar()
+
+    with closing(indice_jobs.conectar(indice_temporario)) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM caixas").fetchone()[0] == 0
+
+
+def test_trabalho_interrompido_e_apagado_depois_da_validade(tmp_path, indice_temporario):
+    interrompido = RegistroJob("etiquetas", tmp_path / "a.pdf", "1", bloco=1)
+    interrompido.adicionar(caixa(1))
+    antigo = (datetime.now() - timedelta(days=2)).isoformat(timespec="seconds")
+    with interrompido.conn:
+        interrompido.conn.execute("UPDATE jobs SET criado_em = ?", (antigo,))
+    interrompido.conn.close()
+
+    registrar_job("etiquetas", tmp_path / "b.pdf", [caixa(2)], "2")
+
+    with closing(indice_jobs.conectar(indice_temporario)) as conn:
+        assert [row["pedido"] for row in conn.execute("SELECT pedido FROM jobs")] == ["2"]
+        assert conn.execute("SELECT COUNT(*) FROM caixas").fetchone()[0] == 1
+
+
+def test_banco_antigo_ganha_a_coluna_concluido(tmp_path, indice_temporario):
+    with closing(sqlite3.connect(indice_temporario)) as conn:
+        conn.execute("CREATE TABLE jobs (id INTEGER PRIMARY KEY, tipo TEXT NOT NULL, pedido TEXT, cliente TEXT,"
+                     " arquivo TEXT NOT NULL, criado_em TEXT NOT NULL, total_caixas INTEGER NOT NULL)")
+        conn.execute("INSERT INTO jobs VALUES (1, 'planilha', '7', NULL, 'x.xlsx', '2025-01-01T00:00:00', 1)")
+        conn.commit()
+
+    with closing(indice_jobs.conectar(indice_temporario)) as conn:
+        conn.execute("INSERT INTO caixas VALUES (1, 2, '00000001', 'GRAMPO', '1/1', 10)")
+        conn.commit()
+
+    assert [c["pedido"] for c in buscar_caixas()] == ["7"]
+
+
+def test_etiquetas_em_memoria_sao_indexadas(tmp_path):
+    planilha = gerar_planilha_caixas(tmp_path / "caixas.xlsx", 5)
+
+    generate_shipping_labels_from_excel(planilha, io.BytesIO())
+
+    caixas = buscar_caixas(pedido=PEDIDO, tipo="etiquetas")
+    assert [c["pagina"] for c in caixas] == list(range(1, 6))
+    assert {c["arquivo"] for c in caixas} == {f"memoria://etiquetas_pedido_{PEDIDO}.pdf"}
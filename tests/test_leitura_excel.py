@@ -0,0 +1,26 @@
+import pytest
+
+from amostras import gerar_planilha_caixas
+from tags_print_from_excel import generate_shipping_labels_from_excel
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+@pytest.mark.parametrize("coluna", ["Produto", "Caixa", "Qtd. na Caixa"])
+def test_celula_vazia_em_coluna_essencial_e_rejeitada(tmp_path, streaming, coluna):
+    planilha = gerar_planilha_caixas(tmp_path / "caixas.xlsx", 5, {2: {coluna: None}})
+
+    with pytest.raises(ValueError):
+        generate_shipping_labels_from_excel(planilha, tmp_path / "etiquetas.pdf", streaming=streaming)
+    assert not (tmp_path / "etiquetas.pdf").exists()
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_planilha_valida_gera_uma_pagina_por_caixa(tmp_path, streaming):
+    from pypdf import PdfReader
+
+    planilha = gerar_planilha_caixas(tmp_path / "caixas.xlsx", 5)
+    saida = tmp_path / "etiquetas.pdf"
+
+    generate_shipping_labels_from_excel(planilha, saida, streaming=streaming)
+
+    assert len(PdfReader(saida).pages) == 5
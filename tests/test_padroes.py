@@ -0,0 +1,126 @@
+"""
+Equivalência e tempo dos padrões de linha (tags_clean2 e tags_excel).
+
+Os padrões atuais usam quantificadores possessivos e lookbehinds para manter a
+busca linear; aqui eles são conferidos contra os padrões originais, que
+definem o comportamento esperado, e medidos em linhas adversariais.
+"""
+import ast
+import random
+import re
+import time
+import zlib
+from pathlib import Path
+
+import pytest
+
+import tags_clean2
+
+RAIZ = Path(__file__).resolve().parent.parent
+CORPUS = Path(__file__).resolve().parent / "dados" / "linhas_golden.txt"
+
+ORIGINAIS = {
+    "romaneio": r'^\d+\s+\d+\s+(\d+)\s+(.*?)\s+(\d{1,3}(?:,\d{1,4})?)$',
+    "pedido": r'^\s*\d+\s+(\d+)\s+(.+?)\s+(?:PC|UN|CT|JG|KG|LT|PAR|MT)\s+([\d.,]+)',
+    "descricao": r'(M\s?\d+|\d+/\d+"?)\s*[xX]\s*(\d+)\s*[xX]\s*(\d+)\s*([A-Z]{1,2})',
+    "orcamento": r'^\d+\s+(\d+)\s+(GRAMPO.*?)\s+PC\s+(\d{1,3}(?:,\d{1,4})?)(?:\s+.*)?$',
+}
+
+
+def padroes_tags_excel():
+    # tags_excel roda o processamento inteiro ao ser importado: os padrões são
+    # lidos do código-fonte
+    padroes = {}
+    for node in ast.walk(ast.parse((RAIZ / "tags_excel.py").read_text(encoding="utf-8"))):
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+            for alvo in node.targets:
+                if isinstance(alvo, ast.Name) and alvo.id in ("pad_romaneio", "pad_orcamento", "pattern"):
+                    padroes[alvo.id] = node.value.value
+    return padroes
+
+
+_excel = padroes_tags_excel()
+
+CASOS = [
+    ("tags_clean2.pad_romaneio", ORIGINAIS["romaneio"], tags_clean2.pad_romaneio),
+    ("tags_clean2.pad_pedido", ORIGINAIS["pedido"], tags_clean2.pad_pedido),
+    ("tags_clean2.pad_descricao", ORIGINAIS["descricao"], tags_clean2.pad_descricao),
+    ("tags_excel.pad_romaneio", ORIGINAIS["romaneio"], _excel["pad_romaneio"]),
+    ("tags_excel.pad_orcamento", ORIGINAIS["orcamento"], _excel["pad_orcamento"]),
+    ("tags_excel.parse_description", ORIGINAIS["descricao"], _excel["pattern"]),
+]
+IDS = [nome for nome, _, _ in CASOS]
+
+
+def resultado(padrao, linha):
+    # Quem usa os grupos aplica .strip() na descrição
+    m = re.search(padrao, linha)
+    return None if m is None else tuple(g.strip() if g else g for g in m.groups())
+
+
+def corpus():
+    return [l for l in CORPUS.read_text(encoding="utf-8").split("\n") if not l.startswith("#")]
+
+
+def linhas_aleatorias(n, seed):
+    rnd = random.Random(seed)
+    alfabeto = list("0123456789 ,./xXMPCUNARGOT\"") + ["PC", "UN", "PAR", "GRAMPO", "  ", "M8", '1/2"']
+    linhas = []
+    for _ in range(n):
+        linhas.append("".join(rnd.choice(alfabeto) for _ in range(rnd.randint(0, 25))))
+        base = (f"{rnd.randint(1, 99)} {rnd.randint(1, 99)} {rnd.randint(1, 9999)} "
+                + "".join(rnd.choice(alfabeto) for _ in range(rnd.randint(0, 15)))
+                + rnd.choice([" 12", " 1,5", "12", " 1234", " PC 12", "  PC 3.5 X", " 1,23456"]))
+        linhas.extend([base, " " + base, base[base.index(" ") + 1:]])
+    return linhas
+
+
+@pytest.mark.parametrize("nome, original, atual", CASOS, ids=IDS)
+def test_corpus_golden(nome, original, atual):
+    linhas = corpus()
+    diferencas = [l for l in linhas if resultado(original, l) != resultado(atual, l)]
+
+    assert not diferencas
+    assert any(resultado(atual, l) for l in linhas), "o corpus não exercita o padrão"
+
+
+@pytest.mark.parametrize("nome, original, atual", CASOS, ids=IDS)
+def test_fuzz_diferencial(nome, original, atual):
+    linhas = linhas_aleatorias(5000, seed=zlib.crc32(nome.encode()))
+    diferencas = [l for l in linhas if resultado(original, l) != resultado(atual, l)]
+
+    assert not diferencas[:10]
+
+
+ADVERSARIAIS = {
+    "espacos": "1 2 3 a" + " " * 20000 + "x",
+    "espacos_unidade": "1 2 a" + " " * 20000 + "x",
+    "digitos": "1" * 20000,
+    "palavras": "1 2 3 " + "a " * 10000,
+    "unidades": "1 2 A" + " PC" * 7000,
+    "medidas": "M1 X" * 5000,
+}
+LIMITE_POR_LINHA = 0.05  # s; os padrões originais levam segundos nessas linhas
+
+
+@pytest.mark.parametrize("linha", ADVERSARIAIS.values(), ids=ADVERSARIAIS)
+@pytest.mark.parametrize("nome, original, atual", CASOS, ids=IDS)
+def test_tempo_em_linhas_adversariais(nome, original, atual, linha):
+    padrao = re.compile(atual)
+    inicio = time.perf_counter()
+    padrao.search(linha)
+    assert time.perf_counter() - inicio < LIMITE_POR_LINHA
+
+
+@pytest.mark.parametrize("nome, original, atual", CASOS, ids=IDS)
+def test_tempo_cresce_linearmente(nome, original, atual):
+    padrao = re.compile(atual)
+
+    def medir(tamanho):
+        linha = "1 2 3 a" + " " * tamanho + "x"
+        inicio = time.perf_counter()
+        padrao.search(linha)
+        return time.perf_counter() - inicio
+
+    curta, longa = medir(20000), medir(200000)
+    assert longa < 30 * curta + 0.01
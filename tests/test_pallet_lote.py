@@ -0,0 +1,73 @@
+import re
+
+import pandas as pd
+import pytest
+from pypdf import PdfReader
+
+import pallet_grokified
+
+
+def pallet(cliente, cidade, nf, transportadora):
+    return {"Cliente": cliente, "Rua": "RUA A, 10", "Bairro": "CENTRO", "Cidade": cidade,
+            "NF": nf, "Transportadora": transportadora}
+
+
+# As duas planilhas se sobrepõem: a NF 1001 aparece nas duas (com 2 pallets na
+# primeira e 1 na segunda) e a NF 1003 é a mesma, escrita de outro jeito
+PLANILHA_A = [
+    pallet("METALURGICA SUL", "PORTO ALEGRE", "1001", "RODONAVES"),
+    pallet("METALURGICA SUL", "PORTO ALEGRE", "1001", "RODONAVES"),
+    pallet("FERRAGENS NORTE", "BELEM", "1002", "BRASPRESS"),
+    pallet("ACO CENTRO", "GOIANIA", "1003", "BRASPRESS"),
+]
+PLANILHA_B = [
+    pallet("METALURGICA SUL", "PORTO ALEGRE", "1001", "RODONAVES"),
+    pallet("aco centro ", "Goiania", "1003", "braspress"),
+    pallet("ACO CENTRO", "ANAPOLIS", "1004", "BRASPRESS"),
+    pallet("ZINCO LESTE", "ARACAJU", "1005", "RODONAVES"),
+    pallet("ZINCO LESTE", "ARACAJU", "1005", "RODONAVES"),
+    pallet("ZINCO LESTE", "ARACAJU", "1005", "RODONAVES"),
+]
+
+# NFs na ordem Transportadora, Cidade, Cliente, NF, uma por pallet
+ESPERADO = ["1004", "1002", "1003", "1005", "1005", "1005", "1001", "1001"]
+
+
+@pytest.fixture
+def planilhas(tmp_path):
+    arquivos = []
+    for nome, linhas in (("a.xlsx", PLANILHA_A), ("b.xlsx", PLANILHA_B)):
+        arquivo = tmp_path / nome
+        pd.DataFrame(linhas).to_excel(arquivo, index=False)
+        arquivos.append(arquivo)
+    return arquivos
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_lote_remove_repetidas_e_ordena(planilhas, max_workers):
+    labels, total_rows = pallet_grokified.load_pallet_batch(planilhas, max_workers)
+
+    assert total_rows == len(PLANILHA_A) + len(PLANILHA_B)
+    assert [label["NF"] for label in labels] == ESPERADO
+
+
+def test_pdf_do_lote_tem_separador_antes_de_cada_transportadora(planilhas, tmp_path):
+    saida = tmp_path / "lote.pdf"
+
+    pallet_grokified.generate_pallet_labels_batch([tmp_path], saida, max_workers=2)
+
+    paginas = [pagina.extract_text() for pagina in PdfReader(saida).pages]
+    assert len(paginas) == len(ESPERADO) + 2
+    resumo = []
+    for texto in paginas:
+        if "etiquetas de pallet" in texto:
+            resumo.append(("separador", texto.splitlines()[0], re.search(r"(\d+) etiquetas", texto).group(1)))
+        else:
+            resumo.append(("etiqueta", re.search(r"NF: (\d+)", texto).group(1)))
+    assert resumo == [
+        ("separador", "BRASPRESS", "3"),
+        ("etiqueta", "1004"), ("etiqueta", "1002"), ("etiqueta", "1003"),
+        ("separador", "RODONAVES", "5"),
+        ("etiqueta", "1005"), ("etiqueta", "1005"), ("etiqueta", "1005"),
+        ("etiqueta", "1001"), ("etiqueta", "1001"),
+    ]
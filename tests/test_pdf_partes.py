@@ -0,0 +1,73 @@
+import pytest
+from pypdf import PdfReader
+from pypdf.generic import IndirectObject
+from reportlab.lib.pagesizes import A6
+from reportlab.pdfgen import canvas
+
+from pdf_partes import juntar_partes, pasta_partes, renderizar_em_partes
+
+
+def desenhar(c, n):
+    c.drawString(20, 100, f"ETIQUETA {n}")
+    c.showPage()
+
+
+def abrir_estrito(path):
+    reader = PdfReader(str(path), strict=True)
+    raiz = reader.trailer["/Root"]["/Pages"]
+    return reader, raiz
+
+
+def objetos_do_tipo(reader, tipo):
+    encontrados = []
+    for idnum in range(1, reader.trailer["/Size"]):
+        obj = reader.get_object(IndirectObject(idnum, 0, reader))
+        if hasattr(obj, "get") and obj.get("/Type") == tipo:
+            encontrados.append(idnum)
+    return encontrados
+
+
+def test_juntar_partes_monta_uma_unica_arvore_de_paginas(tmp_path):
+    partes = []
+    for p in range(3):
+        parte = tmp_path / f"parte_{p}.pdf"
+        c = canvas.Canvas(str(parte), pagesize=A6)
+        for n in range(p * 7 + 1, p * 7 + 8):
+            desenhar(c, n)
+        c.save()
+        partes.append(parte)
+    saida = tmp_path / "final.pdf"
+
+    juntar_partes(partes, saida)
+
+    reader, raiz = abrir_estrito(saida)
+    assert raiz["/Count"] == 21
+    assert reader.trailer["/Root"].raw_get("/Pages").idnum == 1
+    for i, page in enumerate(reader.pages, 1):
+        assert page.raw_get("/Parent").idnum == 1
+        assert f"ETIQUETA {i}" in page.extract_text()
+    assert objetos_do_tipo(reader, "/Pages") == [1]
+    assert objetos_do_tipo(reader, "/Catalog") == [2]
+
+
+def test_renderizar_em_partes_retoma_de_onde_parou(tmp_path):
+    saida = tmp_path / "etiquetas.pdf"
+
+    def falhar_na(n):
+        def draw(c, label):
+            if label == n:
+                raise RuntimeError("interrompido")
+            desenhar(c, label)
+        return draw
+
+    with pytest.raises(RuntimeError):
+        renderizar_em_partes(range(1, 26), falhar_na(18), saida, A6, paginas_por_parte=5)
+    assert len(list(pasta_partes(saida).glob("parte_*.pdf"))) == 3
+
+    total = renderizar_em_partes(range(1, 26), desenhar, saida, A6, paginas_por_parte=5, retomar=True)
+
+    reader, raiz = abrir_estrito(saida)
+    assert total == raiz["/Count"] == 25
+    assert [p.raw_get("/Parent").idnum for p in reader.pages] == [1] * 25
+    assert "ETIQUETA 25" in reader.pages[-1].extract_text()
+    assert not pasta_partes(saida).exists()
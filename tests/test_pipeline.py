@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+from pypdf import PdfReader
+
+import pipeline_etiquetas
+import tags_clean2
+from amostras import CLIENTE, PEDIDO, gerar_pedido_pdf
+from indice_jobs import buscar_caixas
+
+
+@pytest.fixture
+def base_dir(tmp_path):
+    pdf = tmp_path / "pedido.pdf"
+    total = gerar_pedido_pdf(pdf, [10, 5])
+    produtos = tags_clean2.extrair_produtos(tags_clean2.ler_pdf(pdf)[1])["Produto"]
+
+    base = tmp_path / "BASE"
+    base.mkdir()
+    # Capacidade maior que qualquer quantidade do romaneio: uma caixa por item,
+    # a não ser o primeiro, que é dividido em caixas de 1
+    capacidades = [1] + [1000] * (len(produtos) - 1)
+    pd.DataFrame({"Produto": produtos, "Qtd.Embalagem": capacidades}).to_excel(base / "base_quantities.xlsx",
+                                                                               index=False)
+    # Nome com espaços e caixa diferentes do PDF
+    pd.DataFrame([
+        {"Cliente": "  metalurgica   Exemplo ltda ", "Rua": "Rua das Flores, 100", "Bairro": "Centro",
+         "Cidade": "Joinville", "Transportadora": "Rodonaves"},
+        {"Cliente": "OUTRO CLIENTE", "Rua": "Rua B, 1", "Bairro": "Vila", "Cidade": "Blumenau",
+         "Transportadora": "Braspress"},
+    ]).to_excel(base / "clientes_transportadoras.xlsx", index=False)
+    return pdf, base, total
+
+
+def primeira_quantidade(pdf):
+    ordem_prod = tags_clean2.extrair_produtos(tags_clean2.ler_pdf(pdf)[1])
+    return int(ordem_prod["Qtd."].iloc[0])
+
+
+@pytest.mark.parametrize("nf, nf_impressa", [("123456", "123456"), (None, f"PED. {PEDIDO}")])
+def test_pedido_gera_etiquetas_de_caixa_e_pallet(base_dir, tmp_path, monkeypatch, nf, nf_impressa):
+    pdf, base, total = base_dir
+    monkeypatch.chdir(tmp_path)
+
+    pdf_caixas, pdf_pallets, caixas = pipeline_etiquetas.gerar_etiquetas_pedido(pdf, base, nf, pallets=3)
+
+    assert caixas == total - 1 + primeira_quantidade(pdf)
+    assert len(PdfReader(pdf_caixas).pages) == caixas
+    paginas = [pagina.extract_text() for pagina in PdfReader(pdf_pallets).pages]
+    assert len(paginas) == 3
+    for texto in paginas:
+        assert f"Cliente: {CLIENTE}" in texto
+        assert "Rua: RUA DAS FLORES, 100" in texto
+        assert "Bairro: CENTRO" in texto
+        assert "Cidade: JOINVILLE" in texto
+        assert f"NF: {nf_impressa}" in texto
+        assert "Transp: RODONAVES" in texto
+
+    indexadas = buscar_caixas(pedido=PEDIDO, tipo="etiquetas")
+    assert [c["pagina"] for c in indexadas] == list(range(1, caixas + 1))
+    assert {(c["arquivo"], c["cliente"]) for c in indexadas} == {(str(pdf_caixas.resolve()), CLIENTE)}
+
+
+def test_cliente_sem_cadastro(base_dir, tmp_path, monkeypatch):
+    pdf, base, _ = base_dir
+    monkeypatch.chdir(tmp_path)
+    pd.DataFrame([{"Cliente": "OUTRO CLIENTE", "Rua": "Rua B, 1", "Bairro": "Vila", "Cidade": "Blumenau",
+                   "Transportadora": "Braspress"}]).to_excel(base / "clientes_transportadoras.xlsx", index=False)
+
+    with pytest.raises(ValueError, match="Cliente sem endereço"):
+        pipeline_etiquetas.gerar_etiquetas_pedido(pdf, base)
+
+    assert list(tmp_path.glob("etiquetas_*.pdf")) == []
+    assert buscar_caixas(pedido=PEDIDO) == []
+
+
+def test_chave_do_cliente_ignora_espacos_e_caixa():
+    transportadoras = {pipeline_etiquetas.chave_cliente(" Metalurgica\tEXEMPLO  Ltda"): {
+        "Rua": "R", "Bairro": "B", "Cidade": "C", "Transportadora": "T"}}
+
+    labels = pipeline_etiquetas.etiquetas_pallet(CLIENTE, PEDIDO, transportadoras, pallets=2)
+
+    assert [label["NF"] for label in labels] == [f"PED. {PEDIDO}"] * 2
+    assert labels[0]["Cliente"] == CLIENTE
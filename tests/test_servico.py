@@ -0,0 +1,193 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import threading
+import urllib.error
+import urllib.request
+import zipfile
+import io
+
+import pandas as pd
+import pytest
+
+import tags_clean2
+from amostras import gerar_pedido_pdf, gerar_planilha_caixas
+from servico_etiquetas import ServicoEtiquetas, criar_servidor
+
+
+@pytest.fixture
+def base_file(tmp_path):
+    path = tmp_path / "base_quantities.xlsx"
+    pd.DataFrame({"Produto": ["00000001"], "Qtd.Embalagem": [50]}).to_excel(path, index=False)
+    return path
+
+
+@contextmanager
+def iniciar(base_file, **kwargs):
+    kwargs = {"workers": 2, "fila": 2, "timeout": 60, **kwargs}
+    servidor = criar_servidor(porta=0, base_file=base_file, **kwargs)
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield servidor
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+        servidor.servico.encerrar()
+
+
+@pytest.fixture
+def servidor(base_file):
+    with iniciar(base_file) as servidor:
+        yield servidor
+
+
+def requisitar(servidor, metodo, rota, corpo=None):
+    url = f"http://127.0.0.1:{servidor.server_address[1]}{rota}"
+    req = urllib.request.Request(url, data=corpo, method=metodo)
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            return resp.status, resp.headers.get("Content-Type"), resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get("Content-Type"), e.read()
+
+
+def test_pedido_gera_planilha_e_etiquetas(servidor, tmp_path):
+    pdf = tmp_path / "pedido.pdf"
+    total = gerar_pedido_pdf(pdf, [10, 5])
+
+    status, tipo, dados = requisitar(servidor, "POST", "/pedido?saida=ambos", pdf.read_bytes())
+
+    assert status == 200
+    assert tipo == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(dados)) as zf:
+        nomes = zf.namelist()
+        planilha = pd.read_excel(io.BytesIO(zf.read(next(n for n in nomes if n.endswith(".xlsx")))))
+        assert zf.read(next(n for n in nomes if n.endswith(".pdf"))).startswith(b"%PDF")
+    assert planilha["Produto"].nunique() == total
+
+
+def test_caixas_gera_pdf(servidor, tmp_path):
+    planilha = gerar_planilha_caixas(tmp_path / "caixas.xlsx", 3)
+
+    status, tipo, dados = requisitar(servidor, "POST", "/caixas", planilha.read_bytes())
+
+    assert status == 200
+    assert tipo == "application/pdf"
+    assert dados.startswith(b"%PDF")
+
+
+@pytest.mark.parametrize("rota", ["/pedido", "/caixas"])
+def test_corpo_invalido_retorna_400(servidor, rota):
+    status, _, dados = requisitar(servidor, "POST", rota, b"isto nao e um arquivo")
+
+    assert status == 400
+    assert "erro" in json.loads(dados)
+
+
+def test_saude(servidor):
+    status, _, dados = requisitar(servidor, "GET", "/saude")
+
+    assert status == 200
+    assert json.loads(dados)["produtos_na_base"] == 1
+
+
+def test_base_ausente_na_partida(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ServicoEtiquetas(tmp_path / "nao_existe.xlsx")
+
+
+def test_base_removida_depois_falha_a_requisicao(servidor, base_file, tmp_path):
+    pdf = tmp_path / "pedido.pdf"
+    gerar_pedido_pdf(pdf, [5])
+    base_file.unlink()
+
+    status, _, dados = requisitar(servidor, "POST", "/pedido?saida=xlsx", pdf.read_bytes())
+
+    assert status == 500
+    assert "Base de capacidades" in json.loads(dados)["erro"]
+
+
+def produtos_na_planilha(dados):
+    return pd.read_excel(io.BytesIO(dados))["Produto"].nunique()
+
+
+@pytest.mark.parametrize("backend", ["pdfium", "auto"])
+def test_pedidos_paralelos_com_pdfium(base_file, tmp_path, monkeypatch, backend):
+    # O pdfium não é thread-safe: sem o lock do tags_clean2 o processo cai
+    monkeypatch.setattr(tags_clean2, "get_app_dir", lambda: tmp_path)
+    pdf = tmp_path / "pedido.pdf"
+    total = gerar_pedido_pdf(pdf, [40] * 15)
+    corpo = pdf.read_bytes()
+
+    # Uma caixa por produto: o tempo fica na leitura do PDF, não na planilha
+    produtos = tags_clean2.extrair_produtos(tags_clean2.ler_pdf(pdf)[1])["Produto"]
+    pd.DataFrame({"Produto": produtos, "Qtd.Embalagem": 10 ** 6}).to_excel(base_file, index=False)
+
+    with iniciar(base_file, workers=4, fila=32, backend=backend) as servidor:
+        with ThreadPoolExecutor(max_workers=12) as executor:
+            respostas = list(executor.map(
+                lambda _: requisitar(servidor, "POST", "/pedido?saida=xlsx", corpo), range(16)))
+
+    assert [status for status, _, _ in respostas] == [200] * 16
+    assert {produtos_na_planilha(dados) for _, _, dados in respostas} == {total}
+    if backend == "auto":
+        assert len(json.loads((tmp_path / "BASE" / "backends.json").read_text(encoding="utf-8"))) == 1
+
+
+def test_mais_requisicoes_que_workers(base_file, tmp_path):
+    planilha = gerar_planilha_caixas(tmp_path / "caixas.xlsx", 200).read_bytes()
+
+    with iniciar(base_file, workers=2, fila=6) as servidor:
+        servico = servidor.servico
+        original = servico.caixas_para_etiquetas
+        lock = threading.Lock()
+        execucao = {"agora": 0, "max": 0}
+
+        def contando(xlsx_bytes):
+            with lock:
+                execucao["agora"] += 1
+                execucao["max"] = max(execucao["max"], execucao["agora"])
+            try:
+                return original(xlsx_bytes)
+            finally:
+                with lock:
+                    execucao["agora"] -= 1
+
+        servico.caixas_para_etiquetas = contando
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            respostas = list(executor.map(lambda _: requisitar(servidor, "POST", "/caixas", planilha), range(8)))
+        metricas = servico.metricas()["rotas"]["/caixas"]
+
+    assert [status for status, _, _ in respostas] == [200] * 8
+    assert all(dados.startswith(b"%PDF") for _, _, dados in respostas)
+    assert execucao["max"] <= 2
+    assert (metricas["requisicoes"], metricas["ok"], metricas["ocupado"]) == (8, 8, 0)
+
+
+def test_fila_cheia_retorna_503(base_file, tmp_path):
+    planilha = gerar_planilha_caixas(tmp_path / "caixas.xlsx", 1).read_bytes()
+    iniciadas = threading.Semaphore(0)
+    liberar = threading.Event()
+
+    def bloqueante(xlsx_bytes):
+        iniciadas.release()
+        liberar.wait(30)
+        return b"%PDF-bloqueado"
+
+    # Sem fila: as duas vagas ficam ocupadas pelas duas conversões em execução
+    with iniciar(base_file, workers=2, fila=0) as servidor:
+        servidor.servico.caixas_para_etiquetas = bloqueante
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            ocupando = [executor.submit(requisitar, servidor, "POST", "/caixas", planilha) for _ in range(2)]
+            assert iniciadas.acquire(timeout=30) and iniciadas.acquire(timeout=30)
+
+            status, _, dados = requisitar(servidor, "POST", "/caixas", planilha)
+            liberar.set()
+            respostas = [futuro.result() for futuro in ocupando]
+        metricas = servidor.servico.metricas()["rotas"]["/caixas"]
+
+    assert status == 503
+    assert "Fila" in json.loads(dados)["erro"]
+    assert [s for s, _, _ in respostas] == [200, 200]
+    assert (metricas["requisicoes"], metricas["ok"], metricas["ocupado"]) == (3, 2, 1)
@@ -0,0 +1,123 @@
+import re
+import threading
+import time
+
+import pytest
+
+from spool_impressao import (
+    Impressora, ImpressoraDiretorio, carregar_impressoras, dividir_em_lotes,
+    imprimir_em_paralelo, salvar_impressoras,
+)
+
+
+class ImpressoraFalsa(Impressora):
+    """Recebe os lotes em memória e leva `segundos_por_pagina` para "imprimir"."""
+
+    mede_vazao = True
+
+    def __init__(self, nome, segundos_por_pagina, vazao=None, falhar=False):
+        super().__init__(nome, vazao)
+        self.segundos_por_pagina = segundos_por_pagina
+        self.falhar = falhar
+        self.recebidos = []
+        self._lock = threading.Lock()
+
+    def enviar(self, nome_arquivo, dados):
+        if self.falhar:
+            raise ConnectionError("impressora desligada")
+        assert dados.startswith(b"%PDF")
+        inicio, fim = map(int, re.search(r"_p(\d+)-(\d+)", nome_arquivo).groups())
+        time.sleep((fim - inicio + 1) * self.segundos_por_pagina)
+        with self._lock:
+            self.recebidos.append(nome_arquivo)
+
+
+def etiquetas(produtos, caixas_por_produto):
+    return [
+        {"Cliente": "ACME", "Pedido": "1", "Produto": f"{p:08d}", "Descrição": "GRAMPO",
+         "Caixa": f"{c}/{caixas_por_produto}", "Qtd. na Caixa": 10}
+        for p in range(produtos) for c in range(1, caixas_por_produto + 1)
+    ]
+
+
+def test_lotes_nao_separam_produtos():
+    lotes = dividir_em_lotes(etiquetas(10, 7), paginas_por_lote=20)
+
+    paginas = [inicio + i for inicio, lote in lotes for i in range(len(lote))]
+    assert paginas == list(range(1, 71))
+    for _, lote in lotes:
+        assert len(lote) <= 20
+        assert len(lote) % 7 == 0
+
+
+def test_produto_maior_que_o_lote_e_dividido():
+    lotes = dividir_em_lotes(etiquetas(1, 45), paginas_por_lote=20)
+
+    assert [(inicio, len(lote)) for inicio, lote in lotes] == [(1, 20), (21, 20), (41, 5)]
+
+
+def test_imprime_cada_pagina_uma_vez_e_prioriza_a_mais_rapida():
+    rapida = ImpressoraFalsa("rapida", 0.0005, vazao=40)
+    lenta = ImpressoraFalsa("lenta", 0.002, vazao=10)
+
+    resultado = imprimir_em_paralelo(etiquetas(40, 5), [rapida, lenta], paginas_por_lote=20)
+
+    intervalos = sorted(r for i in resultado.values() for r in i["enviados"])
+    paginas = [p for ini, fim in intervalos for p in range(ini, fim + 1)]
+    assert paginas == list(range(1, 201))
+    assert not any(i["falhas"] for i in resultado.values())
+    assert len(rapida.recebidos) > len(lenta.recebidos)
+
+
+def test_lotes_da_impressora_com_falha_vao_para_as_outras():
+    ok = ImpressoraFalsa("ok", 0, vazao=1)
+    quebrada = ImpressoraFalsa("quebrada", 0, vazao=1, falhar=True)
+
+    resultado = imprimir_em_paralelo(etiquetas(4, 5), [ok, quebrada], paginas_por_lote=5)
+
+    assert resultado["quebrada"] == {"enviados": [], "falhas": []}
+    assert sorted(resultado["ok"]["enviados"]) == [(1, 5), (6, 10), (11, 15), (16, 20)]
+    assert resultado["ok"]["falhas"] == []
+
+
+def test_falha_so_quando_todas_as_impressoras_falham():
+    quebradas = [ImpressoraFalsa(f"quebrada{n}", 0, vazao=1, falhar=True) for n in range(3)]
+
+    resultado = imprimir_em_paralelo(etiquetas(4, 5), quebradas, paginas_por_lote=5)
+
+    assert not any(r["enviados"] for r in resultado.values())
+    falhas = sorted(f for r in resultado.values() for f in r["falhas"])
+    assert [(ini, fim) for ini, fim, _ in falhas] == [(1, 5), (6, 10), (11, 15), (16, 20)]
+    assert all("desligada" in erro for _, _, erro in falhas)
+
+
+def test_impressora_sem_enviar_nao_instancia():
+    class SemEnviar(Impressora):
+        pass
+
+    with pytest.raises(TypeError):
+        SemEnviar("x")
+
+
+def test_pasta_sem_aguardar_nao_mede_vazao(tmp_path):
+    pasta = ImpressoraDiretorio("spool", tmp_path, aguardar=False, vazao=2.0)
+
+    imprimir_em_paralelo(etiquetas(3, 5), [pasta], paginas_por_lote=5)
+
+    assert pasta.vazao == 2.0
+    assert len(list(tmp_path.glob("*.pdf"))) == 3
+
+
+def test_configuracao_preserva_timeout_e_vazao(tmp_path):
+    config = tmp_path / "impressoras.json"
+    config.write_text(
+        '[{"nome": "zebra", "tipo": "socket", "host": "10.0.0.1", "timeout": 15, "vazao": 3.5},'
+        ' {"nome": "fila", "tipo": "diretorio", "pasta": "spool", "aguardar": true, "timeout": 90}]',
+        encoding="utf-8",
+    )
+
+    salvar_impressoras(config, carregar_impressoras(config))
+    zebra, fila = carregar_impressoras(config)
+
+    assert (zebra.timeout, zebra.vazao) == (15, 3.5)
+    assert (fila.timeout, fila.aguardar) == (90, True)